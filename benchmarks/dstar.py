@@ -0,0 +1,74 @@
+import argparse
+
+import numpy as np
+
+from benchmarks.solvers import make_maps
+from dstar import DStarLite
+from engine import AUTO_MOVE_DELAY, FIRE_DENSITY, FIRE_SPREAD_INTERVAL, FIRE_SPREAD_PROB, OBSTACLE_DENSITY
+from solvers import a_star_with_parent
+from spread import spread_fire
+
+# Moves the player makes along its path between two spreads, as in a game.
+MOVES_PER_SPREAD = round(FIRE_SPREAD_INTERVAL / AUTO_MOVE_DELAY)
+
+
+def follow(parent, start, goal):
+    # The path from start to goal, start excluded, off a solver's parent map.
+    path = [goal]
+    while path[-1] != start:
+        path.append(parent[path[-1]])
+    return path[-2::-1]
+
+
+def bench(size, maps, spreads, seed):
+    # Walks the player along the D* Lite path; after every spread both the
+    # kept planner and a fresh A* replan from where the player stands.
+    grids, start, goal = make_maps(size, OBSTACLE_DENSITY, FIRE_DENSITY, maps, seed)
+    first, incremental, fresh = [], [], []
+    for k, grid in enumerate(grids):
+        rng = np.random.default_rng([seed, size, k])
+        planner = DStarLite(grid, goal)
+        nodes, success, _, parent, elapsed = planner.plan(start)
+        first.append((nodes, elapsed))
+        pos = start
+        for _ in range(spreads):
+            if not success or pos == goal:
+                break
+            for cell in follow(parent, pos, goal)[:MOVES_PER_SPREAD]:
+                if grid.get(cell):
+                    break
+                pos = cell
+            xs, ys = spread_fire(grid.cells, rng, FIRE_SPREAD_PROB, exempt=(pos, goal))
+            planner.notify(list(zip(xs.tolist(), ys.tolist())))
+            nodes, success, length, parent, elapsed = planner.plan(pos)
+            incremental.append((nodes, elapsed))
+            a_nodes, a_success, a_length, _, a_elapsed = a_star_with_parent(grid, pos, goal)
+            fresh.append((a_nodes, a_elapsed))
+            if (success, length) != (a_success, a_length):
+                raise AssertionError(f"D* Lite and A* disagree from {pos} on map {k}")
+    return first, incremental, fresh
+
+
+def main():
+    parser = argparse.ArgumentParser(description="D* Lite replans after fire spreads vs. A* from scratch.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 60, 120])
+    parser.add_argument("--maps", type=int, default=20)
+    parser.add_argument("--spreads", type=int, default=30, help="most spreads (and replans) per map")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'size':>5} {'replans':>8} {'first nodes':>12} {'D* nodes':>9} {'A* nodes':>9} "
+          f"{'first ms':>9} {'D* ms':>7} {'A* ms':>7} {'D* total':>9} {'A* total':>9}")
+    for size in args.sizes:
+        first, incremental, fresh = bench(size, args.maps, args.spreads, args.seed)
+        d_nodes, d_times = np.array(incremental).T
+        a_nodes, a_times = np.array(fresh).T
+        f_nodes, f_times = np.array(first).T
+        print(f"{size:>5} {len(incremental):>8} {np.mean(f_nodes):>12.0f} {np.mean(d_nodes):>9.0f} "
+              f"{np.mean(a_nodes):>9.0f} {np.mean(f_times) * 1e3:>9.2f} {np.mean(d_times) * 1e3:>7.3f} "
+              f"{np.mean(a_times) * 1e3:>7.3f} {np.sum(d_times) * 1e3:>9.1f} {np.sum(a_times) * 1e3:>9.1f}")
+    print("(nodes and ms are means per plan; totals are over all replans, in ms)")
+
+
+if __name__ == "__main__":
+    main()
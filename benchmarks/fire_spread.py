@@ -0,0 +1,93 @@
+import time
+import random
+import argparse
+
+import numpy as np
+
+from engine import FIRE_SPREAD_PROB, FIRE_DENSITY
+from grid import Grid, FIRE, WALL, DIRECTIONS
+from spread import spread_fire
+
+
+def spread_fire_loop(obstacles, fires, size, exempt, rng, prob):
+    # The per-edge loop FireEngine.spread_fire_step used before the kernel.
+    new_fires = set(fires)
+    for (fx, fy) in list(fires):
+        for dx, dy in DIRECTIONS:
+            nx, ny = fx + dx, fy + dy
+            if not (0 <= nx < size and 0 <= ny < size):
+                continue
+            if (nx, ny) in obstacles or (nx, ny) in fires or (nx, ny) in exempt:
+                continue
+            if rng.random() < prob:
+                new_fires.add((nx, ny))
+    return new_fires
+
+
+def make_grid(size, seed):
+    rng = np.random.default_rng(seed)
+    grid = Grid(size)
+    grid.cells[rng.random((size, size)) < 0.18] = WALL
+    free = grid.cells == 0
+    grid.cells[free & (rng.random((size, size)) < FIRE_DENSITY)] = FIRE
+    return grid
+
+
+def bench(size, ticks, seed):
+    exempt = ((0, 0), (size - 1, size - 1))
+    grid = make_grid(size, seed)
+    obstacles = set(grid.positions(WALL))
+    fires = set(grid.positions(FIRE))
+    rng = random.Random(seed)
+    spread_fire_loop(obstacles, fires, size, exempt, random.Random(seed), FIRE_SPREAD_PROB)
+    t0 = time.perf_counter()
+    for _ in range(ticks):
+        fires = spread_fire_loop(obstacles, fires, size, exempt, rng, FIRE_SPREAD_PROB)
+    loop_time = (time.perf_counter() - t0) / ticks
+
+    np_rng = np.random.default_rng(seed)
+    # One untimed call first: numpy's first use of each ufunc and of the
+    # generator costs more than a whole tick on a small grid.
+    spread_fire(grid.copy().cells, np.random.default_rng(seed), FIRE_SPREAD_PROB, exempt)
+    t0 = time.perf_counter()
+    for _ in range(ticks):
+        spread_fire(grid.cells, np_rng, FIRE_SPREAD_PROB, exempt)
+    kernel_time = (time.perf_counter() - t0) / ticks
+    return loop_time, kernel_time, len(fires), grid.count(FIRE)
+
+
+def check_distribution(trials, seed):
+    # Mean number of cells ignited in one tick from the same start state.
+    grid = make_grid(20, seed)
+    exempt = ((0, 0), (19, 19))
+    obstacles = set(grid.positions(WALL))
+    fires = set(grid.positions(FIRE))
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    loop_total = kernel_total = 0
+    for _ in range(trials):
+        loop_total += len(spread_fire_loop(obstacles, fires, 20, exempt, rng, FIRE_SPREAD_PROB)) - len(fires)
+        xs, _ = spread_fire(grid.copy().cells, np_rng, FIRE_SPREAD_PROB, exempt)
+        kernel_total += len(xs)
+    return loop_total / trials, kernel_total / trials
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the per-edge fire spread loop with the array kernel.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 30, 200, 1000])
+    parser.add_argument("--ticks", type=int, default=10)
+    parser.add_argument("--trials", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'loop ms/tick':>14} {'kernel ms/tick':>16} {'speedup':>9}")
+    for size in args.sizes:
+        loop_time, kernel_time, loop_fires, kernel_fires = bench(size, args.ticks, args.seed)
+        print(f"{size:>6} {loop_time * 1000:>14.3f} {kernel_time * 1000:>16.3f} {loop_time / kernel_time:>8.1f}x"
+              f"   (fires after {args.ticks} ticks: {loop_fires} vs {kernel_fires})")
+    loop_mean, kernel_mean = check_distribution(args.trials, args.seed)
+    print(f"mean ignitions per tick over {args.trials} trials: loop {loop_mean:.3f}, kernel {kernel_mean:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import argparse
+
+import numpy as np
+
+from chunked import ChunkedGrid, generate_building, ignite
+from engine import FIRE_SPREAD_PROB
+from grid import Grid
+from hpa import HierarchicalPlanner
+from solvers import a_star_with_parent
+
+FIRES = 40
+
+
+def free_pairs(grid, rng, count):
+    pairs = []
+    while len(pairs) < count:
+        a, b = (tuple(int(v) for v in rng.integers(0, (grid.width, grid.height))) for _ in range(2))
+        if grid.is_free(a) and grid.is_free(b):
+            pairs.append((a, b))
+    return pairs
+
+
+def bench(size, queries, spreads, flat_max, seed):
+    rng = np.random.default_rng(seed)
+    grid = ChunkedGrid(size)
+    generate_building(grid, rng)
+    ignite(grid, rng, FIRES)
+    planner = HierarchicalPlanner(grid)
+    pairs = free_pairs(grid, rng, queries)
+    # The first plan for a pair builds the portal tables of chunks no
+    # earlier plan needed; asking again runs on cached tables only.
+    first, cached, abstract, results = [], [], [], []
+    for start, goal in pairs:
+        first.append(planner.plan(start, goal)[4])
+        abstract.append(planner.abstract_path(start, goal)[4])
+        result = planner.plan(start, goal)
+        cached.append(result[4])
+        results.append(result)
+    # Flat A* on a dense copy, for time and path length; too big past flat_max.
+    flat, ratios = [], []
+    if size <= flat_max:
+        dense = Grid(size, size, grid.region(0, 0, size, size).tobytes())
+        for (start, goal), (_, success, length, _, _) in zip(pairs, results):
+            _, found, optimal, _, elapsed = a_star_with_parent(dense, start, goal)
+            flat.append(elapsed)
+            if success != found:
+                raise AssertionError(f"HPA* and A* disagree on whether {start} reaches {goal}")
+            if found and optimal:
+                ratios.append(length / optimal)
+    # Replans right after a spread, which has to rebuild the chunks it touched.
+    replans = []
+    for _ in range(spreads):
+        start, goal = pairs[len(replans) % len(pairs)]
+        planner.notify(grid.spread_fire(rng, FIRE_SPREAD_PROB, (start, goal)))
+        replans.append(planner.plan(start, goal)[4])
+    return {
+        "store": grid.nbytes(), "dense": size * size, "cold": first[0], "first": np.median(first),
+        "abstract": np.median(abstract), "cached": np.median(cached),
+        "flat": np.median(flat) if flat else None, "ratio": np.mean(ratios) if ratios else None,
+        "replan": np.median(replans), "success": np.mean([r[1] for r in results]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunked grid storage and HPA* planning vs. flat A* on large maps.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[512, 1024, 4096, 10000])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--spreads", type=int, default=10)
+    parser.add_argument("--flat-max", type=int, default=1024, help="largest map to also run flat A* on")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'store MB':>9} {'dense MB':>9} {'cold ms':>8} {'first ms':>9} {'cached ms':>10} "
+          f"{'portals ms':>11} {'A* ms':>8} {'length':>7} {'replan ms':>10} {'success':>8}")
+    for size in args.sizes:
+        r = bench(size, args.queries, args.spreads, args.flat_max, args.seed)
+        flat = f"{r['flat'] * 1e3:>8.1f}" if r["flat"] is not None else f"{'-':>8}"
+        ratio = f"{r['ratio']:>7.3f}" if r["ratio"] is not None else f"{'-':>7}"
+        print(f"{size:>6} {r['store'] / 1e6:>9.1f} {r['dense'] / 1e6:>9.1f} {r['cold'] * 1e3:>8.1f} "
+              f"{r['first'] * 1e3:>9.1f} {r['cached'] * 1e3:>10.1f} {r['abstract'] * 1e3:>11.1f} {flat} {ratio} "
+              f"{r['replan'] * 1e3:>10.1f} {r['success']:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
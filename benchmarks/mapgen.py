@@ -0,0 +1,86 @@
+import time
+import random
+import argparse
+from collections import deque
+
+import numpy as np
+
+from engine import FIRE_DENSITY
+from grid import Grid, DIRECTIONS
+from mapgen import generate_map
+
+
+def legacy_solvable_map(size, density, rng):
+    # The retry-until-BFS-succeeds loop FireEngine used before mapgen.
+    goal = (size - 1, size - 1)
+    attempts = 0
+    while True:
+        attempts += 1
+        obstacles = set()
+        fires = set()
+        for y in range(size):
+            for x in range(size):
+                if (x, y) in [(0, 0), goal]:
+                    continue
+                if rng.random() < density:
+                    obstacles.add((x, y))
+        for i in range(size):
+            obstacles.discard((i, i))
+        for _ in range(int(size * size * FIRE_DENSITY)):
+            pos = (rng.randrange(size), rng.randrange(size))
+            if pos not in obstacles and pos not in [(0, 0), goal]:
+                fires.add(pos)
+        queue = deque([(0, 0)])
+        visited = {(0, 0)}
+        while queue:
+            x, y = queue.popleft()
+            for dx, dy in DIRECTIONS:
+                nb = (x + dx, y + dy)
+                if 0 <= nb[0] < size and 0 <= nb[1] < size and nb not in visited \
+                        and nb not in obstacles and nb not in fires:
+                    visited.add(nb)
+                    queue.append(nb)
+        if goal in visited:
+            return False
+        if attempts > 200:
+            return True
+
+
+def bench(size, density, seconds, seed):
+    rng = random.Random(seed)
+    count = fallbacks = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        fallbacks += legacy_solvable_map(size, density, rng)
+        count += 1
+    legacy_rate = count / (time.perf_counter() - t0)
+
+    np_rng = np.random.default_rng(seed)
+    grid = Grid(size)
+    fire_count = int(size * size * FIRE_DENSITY)
+    new_count = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        generate_map(grid, np_rng, (0, 0), (size - 1, size - 1), density, fire_count)
+        new_count += 1
+    new_rate = new_count / (time.perf_counter() - t0)
+    return legacy_rate, fallbacks / count, new_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maps per second: retry loop vs. corridor generator.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 300])
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.18, 0.30, 0.40])
+    parser.add_argument("--seconds", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'density':>8} {'legacy maps/s':>14} {'fallback':>9} {'corridor maps/s':>16}")
+    for size in args.sizes:
+        for density in args.densities:
+            legacy_rate, fallback_rate, new_rate = bench(size, density, args.seconds, args.seed)
+            print(f"{size:>6} {density:>8.2f} {legacy_rate:>14.1f} {fallback_rate:>9.0%} {new_rate:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
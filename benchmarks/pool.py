@@ -0,0 +1,51 @@
+import time
+import argparse
+
+from engine import ALGORITHMS, FireEngine, make_solver_pool
+
+
+def play(size, solver, seeds, pool_kind):
+    # Plays each seeded map once with the given solver pool and returns what
+    # each episode came to, plus the wall time it all took.
+    pool = make_solver_pool(pool_kind)
+    engine = FireEngine(grid_size=size, pool=pool)
+    outcomes = []
+    t0 = time.perf_counter()
+    try:
+        for seed in seeds:
+            engine.reset_map(seed)
+            r = engine.run_episode(solver)
+            stats = r["stats"].get(solver, {})
+            outcomes.append((r["result"], r["steps"], r["replans"], r["sim_time"],
+                             stats.get("path_length"), stats.get("success")))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return outcomes, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless episodes with and without a solver pool; "
+                                                 "both must play out the same.")
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument("--episodes", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--solvers", nargs="+", choices=ALGORITHMS, default=["A*", "D* Lite", "Risk A*"])
+    parser.add_argument("--pools", nargs="+", choices=["thread", "process"], default=["thread", "process"])
+    args = parser.parse_args()
+
+    seeds = [args.seed * 1000 + i for i in range(args.episodes)]
+    print(f"{'solver':>10} {'pool':>8} {'wins':>5} {'seconds':>8}")
+    for solver in args.solvers:
+        inline, elapsed = play(args.size, solver, seeds, "none")
+        print(f"{solver:>10} {'none':>8} {sum(o[0] == 'win' for o in inline):>5} {elapsed:>8.2f}")
+        for kind in args.pools:
+            pooled, elapsed = play(args.size, solver, seeds, kind)
+            print(f"{solver:>10} {kind:>8} {sum(o[0] == 'win' for o in pooled):>5} {elapsed:>8.2f}")
+            for seed, a, b in zip(seeds, inline, pooled):
+                if a != b:
+                    raise AssertionError(f"{solver} with a {kind} pool played seed {seed} as {b}, inline as {a}")
+
+
+if __name__ == "__main__":
+    main()
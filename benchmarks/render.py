@@ -0,0 +1,42 @@
+import os
+import time
+import argparse
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from fire import EscapeTheFire, FPS
+
+
+def run(game, frames, full):
+    game.reset_map()
+    game.mode = "playing"
+    game.engine.start_solver("A*")
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        if full:
+            game.background = None
+        game.frame_dt = 1.0 / FPS
+        game.handle_playing()
+        if game.mode != "playing":
+            game.reset_map()
+            game.mode = "playing"
+            game.engine.start_solver("A*")
+    return (time.perf_counter() - t0) / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame time of full redraws vs. dirty-rectangle updates.")
+    parser.add_argument("--frames", type=int, default=600)
+    args = parser.parse_args()
+
+    game = EscapeTheFire(solver_pool="none")
+    game.poll_assets(wait=True)
+    full = run(game, args.frames, full=True)
+    dirty = run(game, args.frames, full=False)
+    print(f"full redraw: {full * 1000:.3f} ms/frame")
+    print(f"dirty rects: {dirty * 1000:.3f} ms/frame ({full / dirty:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
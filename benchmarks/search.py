@@ -0,0 +1,132 @@
+import time
+import heapq
+import argparse
+from collections import deque
+
+import numpy as np
+
+from grid import Grid, DIRECTIONS
+from mapgen import generate_map
+from solvers import manhattan, path_length, bfs_search_with_parent, greedy_with_parent, a_star_with_parent
+
+
+# The tuple-keyed dict/set searches solvers.py used before the flat array
+# kernels, kept here for comparison.
+def legacy_bfs(grid, start, goal):
+    w, h, buf = grid.width, grid.height, grid.buf
+    queue = deque([start])
+    visited = {start}
+    parent = {}
+    nodes = 0
+    while queue:
+        nodes += 1
+        cur = queue.popleft()
+        if cur == goal:
+            return nodes, True, path_length(parent, cur), parent
+        x, y = cur
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < w and 0 <= ny < h and not buf[ny * w + nx]:
+                nb = (nx, ny)
+                if nb not in visited:
+                    visited.add(nb)
+                    parent[nb] = cur
+                    queue.append(nb)
+    return nodes, False, 0, parent
+
+
+def legacy_greedy(grid, start, goal):
+    w, h, buf = grid.width, grid.height, grid.buf
+    pq = [(manhattan(start, goal), start)]
+    visited = {start}
+    parent = {}
+    nodes = 0
+    while pq:
+        nodes += 1
+        _, cur = heapq.heappop(pq)
+        if cur == goal:
+            return nodes, True, path_length(parent, cur), parent
+        x, y = cur
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < w and 0 <= ny < h and not buf[ny * w + nx]:
+                nb = (nx, ny)
+                if nb not in visited:
+                    visited.add(nb)
+                    parent[nb] = cur
+                    heapq.heappush(pq, (manhattan(nb, goal), nb))
+    return nodes, False, 0, parent
+
+
+def legacy_a_star(grid, start, goal):
+    w, h, buf = grid.width, grid.height, grid.buf
+    open_set = [(manhattan(start, goal), start)]
+    g_score = {start: 0}
+    parent = {}
+    nodes = 0
+    closed = set()
+    while open_set:
+        nodes += 1
+        _, cur = heapq.heappop(open_set)
+        if cur in closed:
+            continue
+        if cur == goal:
+            return nodes, True, path_length(parent, cur), parent
+        closed.add(cur)
+        x, y = cur
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < w and 0 <= ny < h) or buf[ny * w + nx]:
+                continue
+            nb = (nx, ny)
+            tentative_g = g_score[cur] + 1
+            if nb not in g_score or tentative_g < g_score[nb]:
+                g_score[nb] = tentative_g
+                parent[nb] = cur
+                heapq.heappush(open_set, (tentative_g + manhattan(nb, goal), nb))
+    return nodes, False, 0, parent
+
+
+PAIRS = [("BFS", legacy_bfs, bfs_search_with_parent),
+         ("Greedy", legacy_greedy, greedy_with_parent),
+         ("A*", legacy_a_star, a_star_with_parent)]
+
+
+def bench(size, searches, seed):
+    # Many searches on one map from scattered starts, like a run of replans.
+    rng = np.random.default_rng(seed)
+    grid = Grid(size)
+    goal = (size - 1, size - 1)
+    generate_map(grid, rng, (0, 0), goal, 0.18, int(size * size * 0.03))
+    free = np.flatnonzero(grid.cells.ravel() == 0)
+    starts = [(int(i) % size, int(i) // size) for i in rng.choice(free, searches)]
+    rows = []
+    for name, legacy, kernel in PAIRS:
+        timings = []
+        for fn in (legacy, kernel):
+            t0 = time.perf_counter()
+            lengths = [fn(grid, start, goal)[2] for start in starts]
+            timings.append((time.perf_counter() - t0) / searches)
+            if fn is legacy:
+                expected = lengths
+        if name != "Greedy" and lengths != expected:
+            raise AssertionError(f"{name}: array kernel found different path lengths")
+        rows.append((name, *timings))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tuple/dict searches vs. flat array kernels with reused buffers.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 50, 100])
+    parser.add_argument("--searches", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'size':>5} {'solver':<7} {'legacy us':>10} {'kernel us':>10} {'speedup':>8}")
+    for size in args.sizes:
+        for name, legacy, kernel in bench(size, args.searches, args.seed):
+            print(f"{size:>5} {name:<7} {legacy * 1e6:>10.1f} {kernel * 1e6:>10.1f} {legacy / kernel:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import csv
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+from engine import ALGORITHMS, AUTO_MOVE_DELAY, FIRE_SPREAD_INTERVAL, FIRE_SPREAD_PROB, solve
+from fireaware import fire_arrival_times
+from risk import burn_risk
+from grid import Grid
+from mapgen import generate_map
+
+PERCENTILES = (50, 95, 99)
+FIELDS = ["size", "obstacle_density", "fire_density", "solver", "maps", "success_rate"] + \
+    [f"{metric}_p{q}" for metric in ("latency_us", "nodes", "optimality") for q in PERCENTILES]
+# Metrics checked against a baseline, and whether larger is worse.
+REGRESSION_METRICS = [("latency_us_p50", True), ("latency_us_p95", True), ("nodes_p50", True),
+                      ("optimality_p95", True), ("success_rate", False)]
+
+
+def make_maps(size, obstacle_density, fire_density, count, seed):
+    start, goal = (0, 0), (size - 1, size - 1)
+    fire_count = int(size * size * fire_density)
+    maps = []
+    for i in range(count):
+        rng = np.random.default_rng([seed, size, i])
+        grid = Grid(size)
+        generate_map(grid, rng, start, goal, obstacle_density, fire_count)
+        maps.append(grid)
+    return maps, start, goal
+
+
+def run_config(size, obstacle_density, fire_density, count, seed, algos, repeat):
+    maps, start, goal = make_maps(size, obstacle_density, fire_density, count, seed)
+    samples = {algo: {"latency_us": [], "nodes": [], "optimality": [], "success": 0} for algo in algos}
+    for i, grid in enumerate(maps):
+        arrival = fire_arrival_times(grid, FIRE_SPREAD_INTERVAL, FIRE_SPREAD_PROB, FIRE_SPREAD_INTERVAL,
+                                     exempt=(start, goal))
+        risk = None
+        if "Risk A*" in algos:
+            risk = burn_risk(grid.cells.copy(), FIRE_SPREAD_PROB, FIRE_SPREAD_INTERVAL, [seed, size, i],
+                             exempt=(goal,))
+        optimal = solve("BFS", grid, start, goal)[0][2]
+        for algo in algos:
+            # Best of `repeat` runs per map keeps scheduler noise out of the
+            # percentiles; the search itself is deterministic.
+            elapsed = None
+            for _ in range(repeat):
+                t0 = time.perf_counter_ns()
+                (nodes, success, length, _, _), _ = solve(algo, grid, start, goal, arrival, AUTO_MOVE_DELAY, risk)
+                ns = time.perf_counter_ns() - t0
+                elapsed = ns if elapsed is None else min(elapsed, ns)
+            s = samples[algo]
+            s["latency_us"].append(elapsed / 1000)
+            s["nodes"].append(nodes)
+            if success:
+                s["success"] += 1
+                s["optimality"].append(length / optimal if optimal else 1.0)
+    rows = []
+    for algo in algos:
+        s = samples[algo]
+        row = {"size": size, "obstacle_density": obstacle_density, "fire_density": fire_density,
+               "solver": algo, "maps": count, "success_rate": s["success"] / count}
+        for metric in ("latency_us", "nodes", "optimality"):
+            values = np.percentile(s[metric], PERCENTILES) if s[metric] else [float("nan")] * len(PERCENTILES)
+            for q, v in zip(PERCENTILES, values):
+                row[f"{metric}_p{q}"] = round(float(v), 3)
+        rows.append(row)
+    return rows
+
+
+def row_key(row):
+    return (int(row["size"]), float(row["obstacle_density"]), float(row["fire_density"]), row["solver"])
+
+
+def find_regressions(rows, baseline, tolerance, success_tolerance):
+    base = {row_key(row): row for row in baseline}
+    regressions = []
+    for row in rows:
+        old = base.get(row_key(row))
+        if old is None:
+            continue
+        for metric, larger_is_worse in REGRESSION_METRICS:
+            new_value, old_value = float(row[metric]), float(old[metric])
+            if larger_is_worse:
+                worse = new_value > old_value * (1 + tolerance)
+            else:
+                worse = new_value < old_value - success_tolerance
+            if worse:
+                regressions.append((row_key(row), metric, old_value, new_value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solver latency, nodes and path quality over seeded maps.")
+    parser.add_argument("--maps", type=int, default=200, help="maps per configuration")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 50, 100])
+    parser.add_argument("--obstacle-densities", type=float, nargs="+", default=[0.18, 0.30])
+    parser.add_argument("--fire-densities", type=float, nargs="+", default=[0.03])
+    parser.add_argument("--solvers", nargs="+", choices=ALGORITHMS, default=ALGORITHMS)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per map; the fastest is kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", help="write one row per configuration and solver")
+    parser.add_argument("--json", help="write the same rows as JSON (usable as --baseline)")
+    parser.add_argument("--baseline", help="JSON from an earlier run; exit 1 if any metric regressed")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative increase in latency, nodes and path length (default 0.25, i.e. 25%%)")
+    parser.add_argument("--success-tolerance", type=float, default=0.0,
+                        help="allowed absolute drop in success rate (default 0: the maps are seeded, so any drop "
+                             "is a solver that now fails where it did not)")
+    args = parser.parse_args()
+
+    rows = []
+    print(f"{'size':>5} {'obst':>5} {'fire':>5} {'solver':<11} {'success':>8} "
+          f"{'p50 us':>9} {'p95 us':>9} {'p99 us':>9} {'p50 nodes':>10} {'p95 opt':>8}")
+    for size in args.sizes:
+        for obstacle_density in args.obstacle_densities:
+            for fire_density in args.fire_densities:
+                for row in run_config(size, obstacle_density, fire_density, args.maps, args.seed, args.solvers,
+                                      args.repeat):
+                    rows.append(row)
+                    print(f"{size:>5} {obstacle_density:>5.2f} {fire_density:>5.2f} {row['solver']:<11} "
+                          f"{row['success_rate']:>8.1%} {row['latency_us_p50']:>9.1f} {row['latency_us_p95']:>9.1f} "
+                          f"{row['latency_us_p99']:>9.1f} {row['nodes_p50']:>10.0f} {row['optimality_p95']:>8.3f}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(rows, json.load(f), args.tolerance, args.success_tolerance)
+        for (size, obstacle_density, fire_density, algo), metric, old, new in regressions:
+            print(f"REGRESSION {algo} size={size} obstacles={obstacle_density} fires={fire_density}: "
+                  f"{metric} {old:g} -> {new:g}")
+        if regressions:
+            sys.exit(1)
+        print("no regressions against", args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+import numpy as np
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+MARKS = ["import", "init", "first frame", "assets", "first map"]
+
+
+def child(mode, spawned):
+    # Runs in a fresh interpreter and prints, as one JSON line, the seconds
+    # from the parent launching it to each point of startup.
+    marks = {}
+
+    def mark(name):
+        marks[name] = time.time() - spawned
+
+    import pygame
+    from fire import EscapeTheFire
+    mark("import")
+    if mode == "eager":
+        # What startup did before: every subsystem, then the images and the
+        # first map, all before the menu is drawn.
+        pygame.init()
+    game = EscapeTheFire(solver_pool="none")
+    if mode == "eager":
+        game.poll_assets(wait=True)
+        game.reset_map()
+    mark("init")
+    game.handle_menu()
+    mark("first frame")
+    game.poll_assets(wait=True)
+    mark("assets")
+    if game.engine is None:
+        game.reset_map()
+    mark("first map")
+    print(json.dumps(marks))
+
+
+def launch(mode):
+    out = subprocess.run([sys.executable, "-m", "benchmarks.startup", "--child", mode, "--spawned", repr(time.time())],
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to the first menu frame, with and without the fast start.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", choices=["eager", "fast"], default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--spawned", type=float, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.spawned)
+        return
+
+    # Modes take turns so both see the same disk cache and machine load.
+    samples = {"eager": [], "fast": []}
+    for _ in range(args.runs):
+        for mode, runs in samples.items():
+            runs.append(launch(mode))
+    # Importing pygame and numpy dominates and is the same for both, so the
+    # later marks are also shown counted from the end of the imports.
+    print(f"{'startup':<8}" + "".join(f"{name + ' ms':>15}" for name in MARKS) + f"{'frame - import':>16}")
+    for mode, runs in samples.items():
+        med = {name: np.median([r[name] for r in runs]) * 1000 for name in MARKS}
+        after = np.median([r["first frame"] - r["import"] for r in runs]) * 1000
+        print(f"{mode:<8}" + "".join(f"{med[name]:>15.0f}" for name in MARKS) + f"{after:>16.1f}")
+    print("(medians in ms from process launch)")
+
+
+if __name__ == "__main__":
+    main()
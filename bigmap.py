@@ -0,0 +1,326 @@
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pygame
+
+from chunked import ChunkedGrid, generate_building, ignite
+from engine import FIRE_SPREAD_INTERVAL, FIRE_SPREAD_PROB
+from hpa import HierarchicalPlanner
+
+WINDOW_WIDTH, WINDOW_HEIGHT = 900, 800
+HUD_HEIGHT = 64
+VIEW_HEIGHT = WINDOW_HEIGHT - HUD_HEIGHT
+FPS = 30
+# Screen pixels per cell at each zoom level.
+ZOOMS = [1, 2, 4, 8, 16]
+SCROLL_SPEED = 600
+DRAG_THRESHOLD = 4
+# Main-thread time per frame spent turning portal hops into cells.
+REFINE_BUDGET = 0.008
+FIRES = 40
+
+# Indexed by cell state: EMPTY, WALL, FIRE.
+PALETTE = np.array([(235, 235, 235), (205, 92, 92), (255, 100, 0)], dtype=np.uint8)
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+BLUE = (0, 0, 200)
+LIGHT_BLUE = (120, 120, 255)
+GREEN = (0, 200, 0)
+GOLD = (212, 175, 55)
+
+
+class BigMapViewer:
+    # Scrolling view of a building-sized ChunkedGrid. Only chunks inside
+    # the viewport are drawn: uniform chunks as one filled rect, the rest
+    # from a surface kept while the chunk stays on screen and its version
+    # is unchanged. The portal search runs on a worker thread; its hops are
+    # refined into cells a few at a time per frame, so the window never
+    # waits on a plan.
+    def __init__(self, size, seed):
+        pygame.init()
+        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        pygame.display.set_caption("Escape the Fire - building")
+        self.font = pygame.font.SysFont(None, 22)
+        self.clock = pygame.time.Clock()
+        self.pool = ThreadPoolExecutor(1)
+        self.size = size
+        self.new_map(seed)
+
+    def new_map(self, seed):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.grid = ChunkedGrid(self.size)
+        generate_building(self.grid, self.rng)
+        ignite(self.grid, self.rng, FIRES)
+        self.planner = HierarchicalPlanner(self.grid)
+        self.zoom = 2
+        self.cam = [0.0, 0.0]
+        self.tiles = {}
+        self.tile_zoom = None
+        self.start = self.goal = None
+        self.pending = None
+        self.plan_again = False
+        self.burning = False
+        self.last_spread = time.perf_counter()
+        self.drag = None
+        self.drawn_chunks = 0
+        self.clear_path()
+
+    def clear_path(self):
+        self.hops = []
+        self.hop_index = 0
+        self.path = []
+        self.path_cells = set()
+        self.path_points = None
+        self.plan_ms = None
+        self.status = ""
+
+    # --- planning ---
+
+    def plan(self):
+        if self.start is None or self.goal is None:
+            return
+        # The worker reads the grid and the planner's caches, so nothing
+        # else touches them until it is done.
+        if self.pending is not None:
+            self.plan_again = True
+            return
+        self.clear_path()
+        self.status = "planning..."
+        self.pending = self.pool.submit(self.planner.abstract_path, self.start, self.goal)
+
+    def poll_plan(self):
+        if self.pending is None or not self.pending.done():
+            return
+        nodes, success, _, hops, elapsed = self.pending.result()
+        self.pending = None
+        if self.plan_again:
+            self.plan_again = False
+            self.plan()
+            return
+        self.plan_ms = elapsed * 1000
+        if not success:
+            self.status = "no path"
+            return
+        self.hops = hops
+        self.hop_index = 1
+        self.set_path([hops[0]])
+        self.status = f"{nodes} portals searched"
+
+    def set_path(self, path):
+        self.path = path
+        self.path_cells = set(path)
+        self.path_points = None
+
+    def refine(self):
+        deadline = time.perf_counter() + REFINE_BUDGET
+        added = []
+        while self.pending is None and self.hop_index < len(self.hops) and time.perf_counter() < deadline:
+            cells = self.planner.refine_hop(self.hops[self.hop_index - 1], self.hops[self.hop_index])
+            if not cells or not self.grid.is_free(cells[-1]):
+                # Fire cut a hop that was not refined yet.
+                self.plan()
+                return
+            added.extend(cells)
+            self.hop_index += 1
+        if added:
+            self.path.extend(added)
+            self.path_cells.update(added)
+            self.path_points = None
+
+    def spread(self):
+        now = time.perf_counter()
+        if not self.burning or self.pending is not None or now - self.last_spread < FIRE_SPREAD_INTERVAL:
+            return
+        self.last_spread = now
+        exempt = [pos for pos in (self.start, self.goal) if pos is not None]
+        ignited = self.grid.spread_fire(self.rng, FIRE_SPREAD_PROB, exempt)
+        self.planner.notify(ignited)
+        self.grid.compact(self.grid.burning)
+        if any(pos in self.path_cells for pos in ignited):
+            self.plan()
+
+    # --- camera ---
+
+    @property
+    def scale(self):
+        return ZOOMS[self.zoom]
+
+    def clamp_camera(self):
+        z = self.scale
+        self.cam[0] = min(max(self.cam[0], 0.0), max(0.0, self.grid.width - WINDOW_WIDTH / z))
+        self.cam[1] = min(max(self.cam[1], 0.0), max(0.0, self.grid.height - VIEW_HEIGHT / z))
+
+    def screen_to_cell(self, pos):
+        z = self.scale
+        return int(self.cam[0] + pos[0] / z), int(self.cam[1] + (pos[1] - HUD_HEIGHT) / z)
+
+    def zoom_at(self, pos, steps):
+        # Keep the cell under the cursor where it is.
+        zoom = min(max(self.zoom + steps, 0), len(ZOOMS) - 1)
+        if zoom == self.zoom:
+            return
+        old, new = self.scale, ZOOMS[zoom]
+        self.cam[0] += pos[0] / old - pos[0] / new
+        self.cam[1] += (pos[1] - HUD_HEIGHT) / old - (pos[1] - HUD_HEIGHT) / new
+        self.zoom = zoom
+        self.clamp_camera()
+
+    def scroll(self, dt):
+        keys = pygame.key.get_pressed()
+        dx = (keys[pygame.K_RIGHT] or keys[pygame.K_d]) - (keys[pygame.K_LEFT] or keys[pygame.K_a])
+        dy = (keys[pygame.K_DOWN] or keys[pygame.K_s]) - (keys[pygame.K_UP] or keys[pygame.K_w])
+        if dx or dy:
+            self.cam[0] += dx * SCROLL_SPEED * dt / self.scale
+            self.cam[1] += dy * SCROLL_SPEED * dt / self.scale
+            self.clamp_camera()
+
+    def set_endpoint(self, which, pos):
+        if not self.grid.is_free(pos):
+            return
+        if which == "start":
+            self.start = pos
+        else:
+            self.goal = pos
+        self.plan()
+
+    # --- drawing ---
+
+    def tile(self, cx, cy):
+        # Surfaces only live while their chunk is on screen, so memory stays
+        # bounded by the viewport at any zoom.
+        version = self.grid.versions[cy][cx]
+        cached = self.tiles.get((cx, cy))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        rgb = PALETTE[self.grid.block(cx, cy)]
+        surface = pygame.surfarray.make_surface(rgb.swapaxes(0, 1))
+        if self.scale > 1:
+            c = self.grid.chunk * self.scale
+            surface = pygame.transform.scale(surface, (c, c))
+        self.tiles[(cx, cy)] = (version, surface)
+        return surface
+
+    def draw_map(self):
+        g, z = self.grid, self.scale
+        c = g.chunk
+        if self.tile_zoom != z:
+            self.tiles = {}
+            self.tile_zoom = z
+        view = pygame.Rect(0, HUD_HEIGHT, WINDOW_WIDTH, VIEW_HEIGHT)
+        self.screen.fill(BLACK, view)
+        ox, oy = -self.cam[0] * z, HUD_HEIGHT - self.cam[1] * z
+        world = pygame.Rect(round(ox), round(oy), g.width * z, g.height * z)
+        self.screen.set_clip(view.clip(world))
+        cx0, cy0 = int(self.cam[0]) // c, int(self.cam[1]) // c
+        cx1 = min(g.cols - 1, int(self.cam[0] + WINDOW_WIDTH / z) // c)
+        cy1 = min(g.rows - 1, int(self.cam[1] + VIEW_HEIGHT / z) // c)
+        visible = set()
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                rect = pygame.Rect(round(ox + cx * c * z), round(oy + cy * c * z), c * z, c * z)
+                state = g.uniform(cx, cy)
+                if state is not None:
+                    self.screen.fill(PALETTE[state].tolist(), rect)
+                else:
+                    self.screen.blit(self.tile(cx, cy), rect)
+                    visible.add((cx, cy))
+        self.tiles = {key: self.tiles[key] for key in visible}
+        self.drawn_chunks = (cx1 - cx0 + 1) * (cy1 - cy0 + 1)
+        self.draw_path(ox, oy, z)
+        self.screen.set_clip(None)
+
+    def draw_path(self, ox, oy, z):
+        width = max(1, z // 3)
+        if len(self.path) > 1:
+            if self.path_points is None:
+                self.path_points = np.array(self.path, dtype=np.float64) + 0.5
+            points = self.path_points * z + (ox, oy)
+            pygame.draw.lines(self.screen, BLUE, False, points.tolist(), width)
+        if self.path and self.hop_index < len(self.hops):
+            ahead = [self.path[-1]] + self.hops[self.hop_index:]
+            points = [(ox + (x + 0.5) * z, oy + (y + 0.5) * z) for x, y in ahead]
+            pygame.draw.lines(self.screen, LIGHT_BLUE, False, points, width)
+        for pos, color in ((self.start, GREEN), (self.goal, GOLD)):
+            if pos is not None:
+                center = (round(ox + (pos[0] + 0.5) * z), round(oy + (pos[1] + 0.5) * z))
+                pygame.draw.circle(self.screen, color, center, max(4, z))
+                pygame.draw.circle(self.screen, BLACK, center, max(4, z), 1)
+
+    def draw_hud(self):
+        g = self.grid
+        self.screen.fill(WHITE, (0, 0, WINDOW_WIDTH, HUD_HEIGHT))
+        plan = f"plan {self.plan_ms:.0f} ms, " if self.plan_ms is not None else ""
+        path = f"path {len(self.path) - 1}" if len(self.path) > 1 else ""
+        lines = [
+            f"{g.width}x{g.height}  zoom {self.scale}px  chunks drawn {self.drawn_chunks}  "
+            f"stored {g.stored_chunks()}/{g.rows * g.cols} ({g.nbytes() / 1e6:.1f} MB)",
+            f"fire {'on' if self.burning else 'off'}  {plan}{path}  {self.status}",
+            "Arrows/drag: scroll  Wheel: zoom  Right click: start  Left click: goal  Space: fire  N: new map",
+        ]
+        for i, text in enumerate(lines):
+            self.screen.blit(self.font.render(text, True, BLACK), (8, 4 + i * 20))
+
+    # --- main loop ---
+
+    def handle_event(self, event):
+        if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+            return False
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_SPACE:
+                self.burning = not self.burning
+                self.last_spread = time.perf_counter()
+            elif event.key == pygame.K_n and self.pending is None:
+                self.new_map(self.seed + 1)
+        elif event.type == pygame.MOUSEWHEEL:
+            self.zoom_at(pygame.mouse.get_pos(), event.y)
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.pos[1] >= HUD_HEIGHT:
+            if event.button == 1:
+                self.drag = (event.pos, tuple(self.cam), False)
+            elif event.button == 3:
+                self.set_endpoint("start", self.screen_to_cell(event.pos))
+        elif event.type == pygame.MOUSEMOTION and self.drag is not None:
+            origin, cam, moved = self.drag
+            dx, dy = event.pos[0] - origin[0], event.pos[1] - origin[1]
+            if moved or abs(dx) + abs(dy) > DRAG_THRESHOLD:
+                self.cam = [cam[0] - dx / self.scale, cam[1] - dy / self.scale]
+                self.clamp_camera()
+                self.drag = (origin, cam, True)
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1 and self.drag is not None:
+            if not self.drag[2]:
+                self.set_endpoint("goal", self.screen_to_cell(event.pos))
+            self.drag = None
+        return True
+
+    def frame(self, dt):
+        self.scroll(dt)
+        self.poll_plan()
+        self.spread()
+        self.refine()
+        self.draw_map()
+        self.draw_hud()
+        pygame.display.flip()
+
+    def run(self):
+        running = True
+        while running:
+            dt = self.clock.tick(FPS) / 1000
+            for event in pygame.event.get():
+                running = running and self.handle_event(event)
+            self.frame(dt)
+        self.pool.shutdown(wait=True)
+        pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scroll and plan across a building-sized chunked map.")
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    BigMapViewer(args.size, args.seed).run()
+
+
+if __name__ == "__main__":
+    main()
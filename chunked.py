@@ -0,0 +1,218 @@
+import numpy as np
+
+from grid import EMPTY, WALL, FIRE, DIRECTIONS
+from spread import burning_neighbour_counts
+
+CHUNK = 64
+# Share of chunks in a generated building that are solid cores, open halls
+# or office floor divided into rooms; offices are the only ones that need
+# real storage.
+CORE_RATE = 0.1
+HALL_RATE = 0.4
+ROOM = 16
+DOOR = 2
+
+
+class ChunkedGrid:
+    # Cell store for maps far larger than the screen. The map is a table of
+    # CHUNK x CHUNK chunks; a chunk whose cells all hold one state is kept
+    # as that int, anything else as a uint8 array. Writing into a uniform
+    # chunk gives it an array, and compact() folds arrays that became
+    # uniform again. Cells past the right and bottom edge read as WALL.
+    def __init__(self, width, height=None, chunk=CHUNK, fill=EMPTY):
+        self.width = width
+        self.height = width if height is None else height
+        self.chunk = chunk
+        self.cols = -(-self.width // chunk)
+        self.rows = -(-self.height // chunk)
+        self.chunks = [[fill] * self.cols for _ in range(self.rows)]
+        # Bumped on every change to a chunk, for caches keyed on its contents.
+        self.versions = [[0] * self.cols for _ in range(self.rows)]
+        self.burning = set()
+        self.padded = set()
+        for cy in range(self.rows):
+            for cx in range(self.cols):
+                if self.chunk_extent(cx, cy) != (chunk, chunk):
+                    self.padded.add((cx, cy))
+                    self.chunks[cy][cx] = self.materialise(cx, cy, fill)
+        if fill == FIRE:
+            self.burning = {(cx, cy) for cy in range(self.rows) for cx in range(self.cols)}
+
+    def chunk_extent(self, cx, cy):
+        c = self.chunk
+        return min(c, self.width - cx * c), min(c, self.height - cy * c)
+
+    def materialise(self, cx, cy, state):
+        block = np.full((self.chunk, self.chunk), state, dtype=np.uint8)
+        w, h = self.chunk_extent(cx, cy)
+        block[h:, :] = WALL
+        block[:, w:] = WALL
+        return block
+
+    def in_bounds(self, pos):
+        x, y = pos
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def chunk_of(self, pos):
+        return pos[0] // self.chunk, pos[1] // self.chunk
+
+    def get(self, pos):
+        x, y = pos
+        c = self.chunk
+        block = self.chunks[y // c][x // c]
+        if isinstance(block, int):
+            return block
+        return int(block[y % c, x % c])
+
+    def is_free(self, pos):
+        return self.in_bounds(pos) and self.get(pos) == EMPTY
+
+    def set(self, pos, state):
+        x, y = pos
+        c = self.chunk
+        cx, cy = x // c, y // c
+        block = self.chunks[cy][cx]
+        if isinstance(block, int):
+            if block == state:
+                return
+            block = self.chunks[cy][cx] = self.materialise(cx, cy, block)
+        block[y % c, x % c] = state
+        self.versions[cy][cx] += 1
+        if state == FIRE:
+            self.burning.add((cx, cy))
+
+    def block(self, cx, cy):
+        # The chunk's cells as an array; uniform chunks give a fresh one.
+        block = self.chunks[cy][cx]
+        if isinstance(block, int):
+            return np.full((self.chunk, self.chunk), block, dtype=np.uint8)
+        return block
+
+    def uniform(self, cx, cy):
+        # The state every cell of the chunk holds, or None.
+        block = self.chunks[cy][cx]
+        return block if isinstance(block, int) else None
+
+    def region(self, x0, y0, x1, y1):
+        # Dense copy of the cells in [x0, x1) x [y0, y1); anything outside
+        # the map reads as WALL.
+        out = np.full((y1 - y0, x1 - x0), WALL, dtype=np.uint8)
+        c = self.chunk
+        for cy in range(max(0, y0 // c), min(self.rows, -(-y1 // c))):
+            for cx in range(max(0, x0 // c), min(self.cols, -(-x1 // c))):
+                bx, by = cx * c, cy * c
+                sx0, sy0 = max(x0, bx), max(y0, by)
+                sx1, sy1 = min(x1, bx + c), min(y1, by + c)
+                block = self.chunks[cy][cx]
+                target = out[sy0 - y0:sy1 - y0, sx0 - x0:sx1 - x0]
+                if isinstance(block, int):
+                    target[:] = block
+                else:
+                    target[:] = block[sy0 - by:sy1 - by, sx0 - bx:sx1 - bx]
+        return out
+
+    def compact(self, chunks=None):
+        # Fold the given chunks (default: all) back to an int where every
+        # cell holds the same state, e.g. once fire has burned one out.
+        if chunks is None:
+            chunks = [(cx, cy) for cy in range(self.rows) for cx in range(self.cols)]
+        folded = 0
+        for cx, cy in chunks:
+            block = self.chunks[cy][cx]
+            if isinstance(block, int) or (cx, cy) in self.padded:
+                continue
+            first = block.flat[0]
+            if (block == first).all():
+                self.chunks[cy][cx] = int(first)
+                folded += 1
+        return folded
+
+    def stored_chunks(self):
+        return sum(not isinstance(block, int) for row in self.chunks for block in row)
+
+    def nbytes(self):
+        return self.stored_chunks() * self.chunk * self.chunk
+
+    def spread_fire(self, rng, prob, exempt=()):
+        # spread.spread_fire, restricted to chunks that are burning or next
+        # to one; each is handled with a one-cell halo from its neighbours.
+        # Ignitions are applied after every chunk has been looked at, so the
+        # result does not depend on the order chunks are visited in.
+        c = self.chunk
+        active = set()
+        for cx, cy in self.burning:
+            active.add((cx, cy))
+            for dx, dy in DIRECTIONS:
+                if 0 <= cx + dx < self.cols and 0 <= cy + dy < self.rows:
+                    active.add((cx + dx, cy + dy))
+        ignite_prob = 1.0 - (1.0 - prob) ** np.arange(5)
+        exempt = set(exempt)
+        hits = []
+        for cx, cy in sorted(active):
+            state = self.uniform(cx, cy)
+            if state is not None and state != EMPTY:
+                continue
+            x0, y0 = cx * c, cy * c
+            padded = self.region(x0 - 1, y0 - 1, x0 + c + 1, y0 + c + 1)
+            counts = burning_neighbour_counts(padded == FIRE)[1:-1, 1:-1]
+            ys, xs = np.nonzero((padded[1:-1, 1:-1] == EMPTY) & (counts > 0))
+            if not len(ys):
+                continue
+            hit = rng.random(len(ys)) < ignite_prob[counts[ys, xs]]
+            hits.extend((x0 + x, y0 + y) for x, y in zip(xs[hit].tolist(), ys[hit].tolist()))
+        ignited = [pos for pos in hits if pos not in exempt]
+        for pos in ignited:
+            self.set(pos, FIRE)
+        return ignited
+
+
+def generate_building(grid, rng, core_rate=CORE_RATE, hall_rate=HALL_RATE, room=ROOM, door=DOOR):
+    # Chunk by chunk: solid cores and open halls stay uniform and cost
+    # nothing; office chunks get a lattice of rooms with a door in every
+    # wall segment, so they connect to each other and to the halls.
+    c = grid.chunk
+    kinds = rng.random((grid.rows, grid.cols))
+    template = np.zeros((c, c), dtype=np.uint8)
+    template[::room, :] = WALL
+    template[:, ::room] = WALL
+    for cy in range(grid.rows):
+        for cx in range(grid.cols):
+            kind = kinds[cy, cx]
+            if kind < core_rate:
+                state = WALL
+            elif kind < core_rate + hall_rate:
+                state = EMPTY
+            else:
+                block = template.copy()
+                for line in range(0, c, room):
+                    for start in range(0, c, room):
+                        span = min(room, c - start) - 1
+                        if span <= door:
+                            continue
+                        at = start + 1 + int(rng.integers(0, span - door + 1))
+                        block[line, at:at + door] = EMPTY
+                        block[at:at + door, line] = EMPTY
+                if (cx, cy) in grid.padded:
+                    w, h = grid.chunk_extent(cx, cy)
+                    block[h:, :] = WALL
+                    block[:, w:] = WALL
+                grid.chunks[cy][cx] = block
+                grid.versions[cy][cx] += 1
+                continue
+            if (cx, cy) in grid.padded:
+                grid.chunks[cy][cx] = grid.materialise(cx, cy, state)
+            else:
+                grid.chunks[cy][cx] = state
+            grid.versions[cy][cx] += 1
+
+
+def ignite(grid, rng, count, exempt=()):
+    # Start `count` fires on random free cells.
+    exempt = set(exempt)
+    started = []
+    while len(started) < count:
+        pos = (int(rng.integers(0, grid.width)), int(rng.integers(0, grid.height)))
+        if grid.get(pos) == EMPTY and pos not in exempt:
+            grid.set(pos, FIRE)
+            started.append(pos)
+    return started
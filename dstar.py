@@ -0,0 +1,202 @@
+import time
+import heapq
+from collections import deque
+
+from solvers import manhattan
+
+INF = 1 << 30
+
+
+class DStarLite:
+    # Searches backwards from the goal so the tree stays valid while the
+    # player walks; newly ignited cells are queued with notify() and only the
+    # vertices whose costs they change are repaired on the next plan(). g,
+    # rhs and the key a cell is queued under are kept per flat index, like
+    # the flow field's distances, since they outlive any one search.
+    def __init__(self, grid, goal):
+        self.grid = grid
+        self.goal = goal
+        n = grid.width * grid.height
+        self.g = [INF] * n
+        self.rhs = [INF] * n
+        self.rhs[goal[1] * grid.width + goal[0]] = 0
+        self.open = []
+        self.queued = [-1] * n
+        self.km = 0
+        self.last_start = None
+        self.pending = []
+
+    def compute_shortest_path(self, start, changed=()):
+        # Repairs the vertices the newly blocked `changed` cells feed, then
+        # settles vertices until start is consistent and no queued key is
+        # below its own. Returns the vertices expanded.
+        #
+        # Keys pack k1 = min(g, rhs) + h + km, then a bit putting a vertex
+        # whose g goes up ahead of one whose g comes down, then for the
+        # latter the deepest (nearest the start) first, as A* breaks ties;
+        # one left at start's k1 cannot lower start's g.
+        w, buf, g, rhs, queued, open_set = self.grid.width, self.grid.buf, self.g, self.rhs, self.queued, self.open
+        n, last = len(g), self.grid.width - 1
+        span = n + 1  # room for the n - rhs tie-break under each k1
+        sx, sy = start
+        s, goal, km = sy * w + sx, self.goal[1] * w + self.goal[0], self.km
+
+        def update_vertex(i):
+            # Queue i under its current key if it is inconsistent, else drop it.
+            if g[i] > rhs[i]:
+                key = ((rhs[i] + abs(i % w - sx) + abs(i // w - sy) + km) * 2 + 1) * span + n - rhs[i]
+            elif g[i] < rhs[i]:
+                key = (g[i] + abs(i % w - sx) + abs(i // w - sy) + km) * 2 * span
+            else:
+                queued[i] = -1
+                return
+            if queued[i] != key:
+                queued[i] = key
+                heapq.heappush(open_set, key * n + i)
+
+        def raise_from(cells):
+            # Sets g to INF for every vertex the blocked cells leave with a
+            # rhs above its g, and for the ones those leave so in turn, then
+            # queues all that changed. A rise never depends on the order it
+            # is done in, so, as in the flow field's repair, this skips the
+            # queue, but only for vertices whose key is within start's: the
+            # rest (mostly behind the player) wait in the queue and are only
+            # raised if start's cost grows past them.
+            limit = min(g[s], rhs[s])
+            raised = 0
+            stack = list(cells)
+            touched = list(cells)
+            while stack:
+                i = stack.pop()
+                if g[i] >= rhs[i]:
+                    continue
+                old, g[i] = g[i], INF
+                raised += 1
+                x = i % w
+                for j in (i + 1 if x < last else -1, i - 1 if x else -1, i + w, i - w):
+                    if 0 <= j < n and not buf[j] and j != goal and rhs[j] == old + 1:
+                        # j keeps its rhs if another neighbour still sits
+                        # at old.
+                        best = INF
+                        y = j % w
+                        for k in (j + 1 if y < last else -1, j - 1 if y else -1, j + w, j - w):
+                            if 0 <= k < n and not buf[k] and g[k] < best:
+                                best = g[k]
+                                if best == old:
+                                    break
+                        if best == old:
+                            continue
+                        rhs[j] = best + 1 if best < INF else INF
+                        touched.append(j)
+                        if g[j] < rhs[j] and g[j] + abs(y - sx) + abs(j // w - sy) <= limit:
+                            stack.append(j)
+            for i in touched:
+                update_vertex(i)
+            return raised
+
+        if not open_set:
+            update_vertex(goal)
+        for i in changed:
+            if i != goal:
+                rhs[i] = INF
+        supported = rhs[s] < INF
+        nodes = raise_from(changed)
+        # If the fires took start's support, proving it cut off could take
+        # settling everything reachable from the goal. So a flood from start
+        # goes along with the search, a cell per vertex settled, and stops
+        # at the first cell with a finite rhs (likely a path to the goal);
+        # one that runs dry has shown start is cut off.
+        flood = deque([s]) if supported and rhs[s] == INF else None
+        seen = {s}
+        while open_set:
+            if flood is not None:
+                if not flood:
+                    break
+                i = flood.popleft()
+                nodes += 1
+                if rhs[i] < INF:
+                    flood = None
+                else:
+                    x = i % w
+                    for j in (i + 1 if x < last else -1, i - 1 if x else -1, i + w, i - w):
+                        if 0 <= j < n and not buf[j] and j not in seen:
+                            seen.add(j)
+                            flood.append(j)
+            key, u = divmod(open_set[0], n)
+            if queued[u] != key:
+                heapq.heappop(open_set)
+                continue
+            if rhs[s] == g[s] and key >= ((g[s] + km) * 2 + 1) * span + n - g[s]:
+                break
+            heapq.heappop(open_set)
+            if g[u] < rhs[u]:
+                # A deferred rise, now within reach; re-key it if start moved.
+                queued[u] = -1
+                update_vertex(u)
+                if queued[u] == key:
+                    queued[u] = -1
+                    nodes += raise_from([u])
+                continue
+            nodes += 1
+            d = rhs[u]
+            new_key = ((d + abs(u % w - sx) + abs(u // w - sy) + km) * 2 + 1) * span + n - d
+            if key < new_key:
+                # Queued under a key from before the start moved.
+                queued[u] = new_key
+                heapq.heappush(open_set, new_key * n + u)
+                continue
+            queued[u] = -1
+            g[u] = d
+            d += 1
+            x = u % w
+            # update_vertex, unrolled: a neighbour whose rhs drops to d is
+            # consistent or can come down further.
+            for j in (u + 1 if x < last else -1, u - 1 if x else -1, u + w, u - w):
+                if 0 <= j < n and not buf[j] and rhs[j] > d:
+                    rhs[j] = d
+                    if g[j] > d:
+                        key = ((d + abs(j % w - sx) + abs(j // w - sy) + km) * 2 + 1) * span + n - d
+                        if queued[j] != key:
+                            queued[j] = key
+                            heapq.heappush(open_set, key * n + j)
+                    elif g[j] == d:
+                        queued[j] = -1
+        return nodes
+
+    def notify(self, cells):
+        # A cell the search never reached feeds no rhs, so burning it
+        # changes nothing the next plan() would look at.
+        w, g, rhs = self.grid.width, self.g, self.rhs
+        for x, y in cells:
+            i = y * w + x
+            if g[i] < INF or rhs[i] < INF:
+                self.pending.append(i)
+
+    def plan(self, start, parents=True):
+        t0 = time.perf_counter()
+        w, g = self.grid.width, self.g
+        if self.last_start is not None:
+            self.km += manhattan(self.last_start, start)
+        self.last_start = start
+        pending, self.pending = self.pending, []
+        nodes = self.compute_shortest_path(start, pending)
+        s, goal = start[1] * w + start[0], self.goal[1] * w + self.goal[0]
+        if g[s] == INF:
+            return nodes, False, 0, {} if parents else None, time.perf_counter() - t0
+        if not parents:
+            # start is consistent once the repair stops, so g is its length.
+            return nodes, True, g[s], None, time.perf_counter() - t0
+        buf, n = self.grid.buf, len(g)
+        parent = {}
+        length = 0
+        cur = s
+        while cur != goal:
+            x = cur % w
+            nxt = min((j for j in (cur + 1 if x < w - 1 else -1, cur - 1 if x else -1, cur + w, cur - w)
+                       if 0 <= j < n and not buf[j]), key=g.__getitem__, default=-1)
+            if nxt < 0 or g[nxt] == INF:
+                return nodes, False, 0, {}, time.perf_counter() - t0
+            parent[(nxt % w, nxt // w)] = (x, cur // w)
+            cur = nxt
+            length += 1
+        return nodes, True, length, parent, time.perf_counter() - t0
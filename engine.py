@@ -0,0 +1,622 @@
+import os
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import numpy as np
+
+import solvers
+from spread import spread_fire
+from mapgen import generate_map
+from dstar import DStarLite
+from flowfield import FlowField
+from telemetry import Telemetry, NO_TELEMETRY
+from replay import ReplayRecorder, MOVES, OP_MOVE, OP_SOLVER, OP_FIRE, OP_AUTO, OP_INSTALL
+from fireaware import INF, fire_arrival_times, fire_aware_with_fallback
+from risk import burn_risk, risk_a_star_with_parent
+from grid import Grid, CellSetView, EMPTY, WALL, FIRE
+
+GRID_SIZE = 20
+FIRE_SPREAD_INTERVAL = 1.2
+FIRE_SPREAD_PROB = 0.22
+AUTO_MOVE_DELAY = 0.20
+OBSTACLE_DENSITY = 0.18
+FIRE_DENSITY = 0.03
+
+# The simulation advances in fixed ticks of SIM_DT seconds. Fire spreads
+# and auto-moves fall due after whole numbers of ticks, whatever the frame
+# rate of whoever is driving the engine.
+SIM_DT = 1.0 / 30
+FIRE_SPREAD_TICKS = round(FIRE_SPREAD_INTERVAL / SIM_DT)
+AUTO_MOVE_TICKS = round(AUTO_MOVE_DELAY / SIM_DT)
+# update() counts at most this much frame time, so a stall (a dragged
+# window, a breakpoint) slows the game down instead of skipping ahead.
+MAX_FRAME_DT = 0.25
+MAX_EPISODE_TIME = 120.0
+
+ALGORITHMS = ["A*", "Greedy", "BFS", "D* Lite", "Fire-aware", "Bi-BFS", "Bi-A*", "JPS", "Flow field", "Risk A*"]
+REPLANNING_SOLVERS = ("A*", "D* Lite", "Fire-aware", "Flow field", "Risk A*")
+# Solvers that always return a shortest path, so their length and success
+# can be read off the flow field without running them.
+OPTIMAL_SOLVERS = ("A*", "BFS", "D* Lite", "Bi-BFS", "Bi-A*", "JPS", "Flow field")
+
+
+def new_stats(time=0.0, nodes=0, length=0, success=False, derived=False):
+    # derived marks stats read off another solver's result instead of
+    # measured: only length and success mean anything then.
+    return {"time": time, "nodes_expanded": nodes, "path_length": length, "success": success,
+            "replans": 0, "replan_nodes": 0, "derived": derived}
+
+
+def solve(algo_name, grid, start, goal, arrival=None, move_delay=AUTO_MOVE_DELAY, risk=None, parents=True):
+    # Entry point for the worker pools: runs one solver on a private copy of
+    # the map and returns its result tuple, plus the D* Lite or flow field
+    # planner so the engine can keep repairing it. With parents=False the
+    # result carries None for the parent map, which then never gets built
+    # or pickled.
+    if algo_name == "D* Lite":
+        planner = DStarLite(grid, goal)
+        return planner.plan(start, parents), planner
+    if algo_name == "Flow field":
+        planner = FlowField(grid, goal)
+        return planner.plan(start, parents), planner
+    if algo_name == "Fire-aware":
+        return fire_aware_with_fallback(grid, start, goal, arrival, move_delay, parents), None
+    if algo_name == "Risk A*":
+        if isinstance(risk, tuple):
+            # Only the seed was sent: build the risk map here rather than
+            # on the engine's thread. Same seed, same map as risk_map().
+            seed, elapsed = risk
+            risk = burn_risk(grid.cells.copy(), FIRE_SPREAD_PROB, FIRE_SPREAD_INTERVAL, seed,
+                             exempt=(goal,)).after(elapsed)
+        return risk_a_star_with_parent(grid, start, goal, risk, move_delay, parents=parents), None
+    return solvers.SOLVERS[algo_name](grid, start, goal, parents), None
+
+
+def make_solver_pool(kind):
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=len(ALGORITHMS))
+    if kind == "process":
+        workers = min(len(ALGORITHMS), os.cpu_count() or 1)
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return None
+
+
+class FireEngine:
+    def __init__(self, grid_size=GRID_SIZE, seed=None, pool=None, obstacle_density=OBSTACLE_DENSITY, fire_count=None,
+                 replay_dir=None, telemetry=NO_TELEMETRY, solvers=ALGORITHMS):
+        self.grid_size = grid_size
+        self.pool = pool
+        # Solvers run when movement starts, on top of the chosen one; the
+        # GUI wants them all for the result screen, an evaluation only the
+        # one it is scoring.
+        self.solvers = list(solvers)
+        self.obstacle_density = obstacle_density
+        self.fire_count = int(grid_size * grid_size * FIRE_DENSITY) if fire_count is None else fire_count
+        self.seed_source = np.random.default_rng(seed)
+        self.replay_dir = replay_dir
+        self.recorder = None
+        self.telemetry = telemetry
+        self.tick = 0
+        self.accumulator = 0.0
+        self.grid = Grid(grid_size)
+        self.record = {}
+        self.result = None
+        self.episode_solver = None
+        self.episode_recorded = True
+        self.reset_map()
+
+    @property
+    def now(self):
+        return self.tick * SIM_DT
+
+    @property
+    def obstacles(self):
+        return CellSetView(self.grid, WALL)
+
+    @obstacles.setter
+    def obstacles(self, positions):
+        self.grid.clear(WALL)
+        self.obstacles.update(positions)
+
+    @property
+    def fires(self):
+        return CellSetView(self.grid, FIRE)
+
+    @fires.setter
+    def fires(self, positions):
+        self.grid.clear(FIRE)
+        self.fires.update(positions)
+
+    def reset_map(self, seed=None):
+        self.finish_episode()
+        # Each episode gets its own seed so it can be regenerated and
+        # replayed on its own; map generation and fire spread both draw
+        # from the generator seeded here.
+        self.episode_seed = int(self.seed_source.integers(2 ** 63)) if seed is None else seed
+        self.np_rng = np.random.default_rng(self.episode_seed)
+        self.player_pos = (0, 0)
+        self.goal_pos = (self.grid_size - 1, self.grid_size - 1)
+        self.generate_solvable_map()
+        self.initial_state = (self.player_pos, self.goal_pos, self.grid.copy())
+        self.steps = 0
+        self.start_time = None
+        self.episode_start = self.tick
+        self.movement_started = False
+        self.selected_solver = None
+        self.auto_path = []
+        self.auto_step_index = 0
+        self.stats = {}
+        self.algo_start_time = None
+        self.last_fire_tick = self.tick
+        self.auto_move_delay = AUTO_MOVE_DELAY
+        self.auto_move_ticks = AUTO_MOVE_TICKS
+        self.last_auto_move_tick = self.tick - self.auto_move_ticks
+        self.prev_player_pos = self.player_pos
+        self.moved_tick = self.tick - self.auto_move_ticks
+        self.accumulator = 0.0
+        self.parents_cache = {}
+        self.dstar = None
+        self.flow = None
+        self.awaiting_path = None
+        self.pending_results = {}
+        self.stats_queue = []
+        self.fire_tick = 0
+        self.arrival_cache = None
+        self.risk_cache = None
+        self.result = None
+        self.episode_solver = None
+        self.episode_recorded = False
+        self.recorder = ReplayRecorder(self) if self.replay_dir else None
+
+    def log(self, op, arg=0):
+        if self.recorder is not None:
+            self.recorder.record(self.tick, op, arg)
+
+    def generate_solvable_map(self):
+        generate_map(self.grid, self.np_rng, self.player_pos, self.goal_pos, self.obstacle_density, self.fire_count)
+
+    def bfs_check_path_exists(self, start, goal):
+        return solvers.bfs_check_path_exists(self.grid, start, goal)
+
+    def get_neighbors(self, pos):
+        return self.grid.get_neighbors(pos)
+
+    def bfs_search_with_parent(self, start, parents=True):
+        return solvers.bfs_search_with_parent(self.grid, start, self.goal_pos, parents)
+
+    def greedy_with_parent(self, start, parents=True):
+        return solvers.greedy_with_parent(self.grid, start, self.goal_pos, parents)
+
+    def a_star_with_parent(self, start, parents=True):
+        return solvers.a_star_with_parent(self.grid, start, self.goal_pos, parents)
+
+    def d_star_lite_with_parent(self, start, parents=True):
+        if self.dstar is None:
+            self.dstar = DStarLite(self.grid, self.goal_pos)
+        return self.dstar.plan(start, parents)
+
+    def flow_field_with_parent(self, start, parents=True):
+        if self.flow is None:
+            self.flow = FlowField(self.grid, self.goal_pos)
+        return self.flow.plan(start, parents)
+
+    def fire_arrival(self):
+        # Arrival times are estimated once per fire tick, as seen from the
+        # spread itself, and shifted on every lookup by the time since, so
+        # a later replan in the same fire tick sees the fire that much nearer.
+        if self.arrival_cache is None or self.arrival_cache[0] != self.fire_tick:
+            arrival = fire_arrival_times(self.grid, FIRE_SPREAD_INTERVAL, FIRE_SPREAD_PROB,
+                                         FIRE_SPREAD_TICKS * SIM_DT, exempt=(self.goal_pos,))
+            self.arrival_cache = (self.fire_tick, np.array(arrival))
+        elapsed = min(self.tick - self.last_fire_tick, FIRE_SPREAD_TICKS) * SIM_DT
+        arrival = (self.arrival_cache[1] - elapsed).tolist()
+        x, y = self.player_pos
+        arrival[y * self.grid.width + x] = INF
+        return arrival
+
+    def risk_map(self):
+        # Rollouts are seeded from the episode and fire tick rather than
+        # np_rng, and only the goal is exempt, so the map is the same however
+        # often (or whenever, e.g. for the GUI heat map) it is asked for.
+        if self.risk_cache is None or self.risk_cache[0] != self.fire_tick:
+            risk = burn_risk(self.grid.cells.copy(), FIRE_SPREAD_PROB, FIRE_SPREAD_INTERVAL,
+                             seed=(self.episode_seed, self.fire_tick), exempt=(self.goal_pos,), pool=self.pool)
+            self.risk_cache = (self.fire_tick, risk)
+        return self.risk_cache[1].after((self.tick - self.last_fire_tick) * SIM_DT)
+
+    def risk_a_star_with_parent(self, start, parents=True):
+        return risk_a_star_with_parent(self.grid, start, self.goal_pos, self.risk_map(), self.auto_move_delay,
+                                       parents=parents)
+
+    def fire_aware_with_parent(self, start, parents=True):
+        return fire_aware_with_fallback(self.grid, start, self.goal_pos, self.fire_arrival(), self.auto_move_delay,
+                                        parents)
+
+    def solver(self, algo_name):
+        if algo_name == "D* Lite":
+            return self.d_star_lite_with_parent
+        if algo_name == "Fire-aware":
+            return self.fire_aware_with_parent
+        if algo_name == "Flow field":
+            return self.flow_field_with_parent
+        if algo_name == "Risk A*":
+            return self.risk_a_star_with_parent
+        search = solvers.SOLVERS[algo_name]
+        return lambda start, parents=True: search(self.grid, start, self.goal_pos, parents)
+
+    def run_solver(self, algo_name, start, parents=True):
+        return self.solver(algo_name)(start, parents)
+
+    def reconstruct_path_from_parent(self, parent, start_override=None):
+        cur = self.goal_pos
+        path = []
+        while cur in parent:
+            path.append(cur)
+            cur = parent[cur]
+        path.reverse()
+        if start_override and path and path[0] == start_override:
+            path = path[1:]
+        if path and path[0] == self.player_pos:
+            path = path[1:]
+        return path
+
+    def start_solver(self, algo_name):
+        self.log(OP_SOLVER, ALGORITHMS.index(algo_name))
+        self.pending_solver = algo_name
+        self.start_movement(trigger="solver")
+
+    def start_movement(self, trigger="manual"):
+        chosen = getattr(self, "pending_solver", None)
+        if chosen:
+            delattr(self, "pending_solver")
+        if self.movement_started:
+            # A solver picked after the player already moved is not adopted,
+            # and the episode stays recorded as whatever started it.
+            return
+        self.movement_started = True
+        self.algo_start_time = self.now
+        if chosen:
+            self.selected_solver = chosen
+            self.awaiting_path = chosen
+            self.episode_solver = chosen
+        self.dstar = None
+        s = self.player_pos
+        algos = [algo for algo in ALGORITHMS if algo in self.solvers or algo == chosen]
+        if self.pool is None:
+            for algo in algos:
+                self.install_result(algo, s, self.run_solver(algo, s, parents=algo == self.awaiting_path))
+        else:
+            self.dispatch_solvers(s, algos)
+
+    def dispatch_solvers(self, start, algos=ALGORITHMS):
+        snapshot = self.grid.copy()
+        arrival = self.fire_arrival() if "Fire-aware" in algos else None
+        risk = None
+        if "Risk A*" in algos:
+            elapsed = (self.tick - self.last_fire_tick) * SIM_DT
+            if self.risk_cache is not None and self.risk_cache[0] == self.fire_tick:
+                risk = self.risk_cache[1].after(elapsed)
+            else:
+                risk = ((self.episode_seed, self.fire_tick), elapsed)
+        for algo in algos:
+            # Only the solver whose path will be followed needs its parents.
+            parents = algo == self.awaiting_path
+            algo_arrival = arrival if algo == "Fire-aware" else None
+            algo_risk = risk if algo == "Risk A*" else None
+            future = self.pool.submit(solve, algo, snapshot, start, self.goal_pos, algo_arrival, self.auto_move_delay,
+                                      algo_risk, parents)
+            self.pending_results[algo] = (future, start, snapshot)
+
+    def poll_solvers(self, wait=False):
+        for algo, (future, *_) in list(self.pending_results.items()):
+            if wait or future.done():
+                self.collect_solver(algo)
+
+    def collect_solver(self, algo):
+        self.log(OP_INSTALL, ALGORITHMS.index(algo))
+        future, start, snapshot = self.pending_results.pop(algo)
+        result, planner = future.result()
+        if planner is not None:
+            self.adopt_planner(algo, planner, snapshot)
+        self.install_result(algo, start, result)
+
+    def adopt_planner(self, algo, planner, snapshot):
+        # The planner searched the snapshot its job was sent with; point it
+        # at the live grid and replay whatever ignited since then.
+        ys, xs = np.nonzero(snapshot.cells != self.grid.cells)
+        planner.grid = self.grid
+        planner.notify(list(zip(xs.tolist(), ys.tolist())))
+        if algo == "Flow field":
+            self.flow = planner
+        else:
+            self.dstar = planner
+
+    def install_result(self, algo, start, result):
+        nodes, succ, length, parent, comp_time = result
+        self.stats[algo] = new_stats(comp_time, nodes, length, succ)
+        self.telemetry.count("expansions", nodes)
+        self.parents_cache.pop(algo, None)
+        if parent is not None:
+            self.parents_cache[algo] = parent
+        if algo != self.awaiting_path:
+            return
+        self.awaiting_path = None
+        if self.selected_solver != algo or self.player_pos != start:
+            return
+        main_path = self.reconstruct_path_from_parent(parent, start_override=start)
+        if main_path:
+            self.auto_path = main_path
+            self.auto_step_index = 0
+            self.last_auto_move_tick = self.tick - self.auto_move_ticks
+        else:
+            self.auto_path = []
+            self.auto_step_index = 0
+
+    def spread_fire_step(self):
+        xs, ys = spread_fire(self.grid.cells, self.np_rng, FIRE_SPREAD_PROB,
+                             exempt=(self.player_pos, self.goal_pos))
+        ignited = list(zip(xs.tolist(), ys.tolist()))
+        self.fire_tick += 1
+        if self.dstar is not None and ignited:
+            self.dstar.notify(ignited)
+        if self.flow is not None and ignited:
+            self.flow.notify(ignited)
+        return ignited
+
+    def advance_fire(self):
+        self.log(OP_FIRE)
+        self.spread_fire_step()
+        self.last_fire_tick = self.tick
+
+    def move_player(self, dx, dy):
+        self.log(OP_MOVE, MOVES.index((dx, dy)))
+        if not self.start_time:
+            self.start_time = self.now
+        if not self.movement_started:
+            self.start_movement(trigger="manual")
+        x, y = self.player_pos
+        nx, ny = x + dx, y + dy
+        if self.grid.in_bounds((nx, ny)) and self.grid.get((nx, ny)) != WALL:
+            self.set_player_pos((nx, ny))
+            self.steps += 1
+            if self.auto_path or self.awaiting_path:
+                self.auto_path = []
+                self.auto_step_index = 0
+                self.selected_solver = None
+                self.awaiting_path = None
+
+    def auto_move_tick(self):
+        if not (self.auto_path and self.selected_solver):
+            return
+        if self.tick - self.last_auto_move_tick < self.auto_move_ticks:
+            return
+        self.auto_step()
+
+    def auto_step(self):
+        self.log(OP_AUTO)
+        if self.auto_step_index >= len(self.auto_path):
+            self.auto_path = []
+            self.auto_step_index = 0
+            return
+        next_pos = self.auto_path[self.auto_step_index]
+        if self.grid.get(next_pos) != EMPTY:
+            if self.selected_solver in REPLANNING_SOLVERS:
+                self.telemetry.mark("auto_move")
+                self.replan()
+                self.telemetry.mark("replan")
+            else:
+                self.auto_path = []
+                self.auto_step_index = 0
+                if self.selected_solver not in self.stats:
+                    self.stats[self.selected_solver] = new_stats()
+                self.selected_solver = None
+        else:
+            if not self.start_time:
+                self.start_time = self.now
+            self.set_player_pos(next_pos)
+            self.auto_step_index += 1
+            self.last_auto_move_tick = self.tick
+            self.steps += 1
+
+    def set_player_pos(self, pos):
+        self.prev_player_pos = self.player_pos
+        self.player_pos = pos
+        self.moved_tick = self.tick
+
+    def move_progress(self):
+        # Display only: how far (0 to 1) a view should have slid the player
+        # from prev_player_pos to player_pos, counting the part tick left in
+        # the accumulator so the slide is smooth at any frame rate.
+        ticks = self.tick - self.moved_tick + self.accumulator / SIM_DT
+        return min(1.0, ticks / self.auto_move_ticks)
+
+    def replan(self):
+        algo = self.selected_solver
+        n, succ, pl, parent, comp_time = self.run_solver(algo, self.player_pos)
+        s = self.stats.setdefault(algo, new_stats())
+        s["time"] += comp_time
+        s["nodes_expanded"] += n
+        s["path_length"] = pl
+        s["success"] = succ
+        s["replans"] += 1
+        s["replan_nodes"] += n
+        self.telemetry.count("replans")
+        self.telemetry.count("expansions", n)
+        if succ:
+            self.auto_path = self.reconstruct_path_from_parent(parent, start_override=self.player_pos)
+            self.auto_step_index = 0
+            self.last_auto_move_tick = self.tick - self.auto_move_ticks
+        else:
+            self.auto_path = []
+            self.auto_step_index = 0
+            self.selected_solver = None
+
+    def step(self):
+        tel = self.telemetry
+        self.tick += 1
+        if self.pending_results:
+            self.poll_solvers()
+            tel.mark("solver_poll")
+        if self.tick - self.last_fire_tick >= FIRE_SPREAD_TICKS:
+            self.advance_fire()
+            tel.mark("fire_spread")
+        self.auto_move_tick()
+        tel.mark("auto_move")
+        return self.check_finished()
+
+    def step_waiting(self):
+        # A tick for loops that run unthrottled: pooled solvers are waited
+        # for rather than raced, or the fire would outrun them by however
+        # long they took on the wall clock.
+        if self.pending_results:
+            self.poll_solvers(wait=True)
+        return self.step()
+
+    def update(self, dt, speed=1.0):
+        # Fixed timestep: frame time, scaled by the speed multiplier, fills
+        # an accumulator that is drained in whole ticks. A slow frame runs
+        # several ticks rather than one long one, and what is left over only
+        # feeds move_progress().
+        self.accumulator += min(dt, MAX_FRAME_DT) * speed
+        while self.accumulator >= SIM_DT:
+            self.accumulator -= SIM_DT
+            if self.step():
+                self.accumulator = 0.0
+                return True
+        return False
+
+    def check_finished(self):
+        if self.player_pos == self.goal_pos:
+            self.result = "win"
+        elif self.player_pos in self.fires:
+            self.result = "fail"
+        if self.result is not None:
+            self.finish_episode()
+            return True
+        return False
+
+    def finish_episode(self):
+        # Fold the episode into the per-solver session record once, either
+        # when it ends or when the map is reset with the episode unfinished.
+        if self.episode_recorded or not self.movement_started:
+            return
+        self.episode_recorded = True
+        algo = self.episode_solver or "Manual"
+        rec = self.record.setdefault(algo, {"episodes": 0, "wins": 0, "replans": 0})
+        rec["episodes"] += 1
+        rec["wins"] += self.result == "win"
+        rec["replans"] += self.stats.get(algo, {}).get("replans", 0)
+        self.telemetry.emit({"type": "episode", "seed": self.episode_seed, "solver": algo,
+                             "result": self.result or "stuck", "steps": self.steps,
+                             "replans": self.stats.get(algo, {}).get("replans", 0),
+                             "sim_time": round((self.tick - self.episode_start) * SIM_DT, 3)})
+        if self.recorder is not None:
+            self.recorder.finish(self)
+            os.makedirs(self.replay_dir, exist_ok=True)
+            self.recorder.save(os.path.join(self.replay_dir, f"episode-{self.episode_seed}.efr"))
+            self.recorder = None
+
+    def success_rate(self, algo):
+        rec = self.record.get(algo)
+        if not rec or not rec["episodes"]:
+            return None
+        return rec["wins"] / rec["episodes"], rec["replans"] / rec["episodes"]
+
+    def start_missing_stats(self):
+        # Fills the stats of solvers that never ran this episode without
+        # blocking the caller. Shortest-path solvers all agree on length and
+        # success, which the flow field already knows for the player's cell,
+        # so those rows are derived from it and carry no time or node count;
+        # the others are sent to the pool, or queued for poll_missing_stats()
+        # to run one at a time when there is none.
+        self.poll_solvers()
+        missing = [algo for algo in ALGORITHMS if algo not in self.stats and algo not in self.pending_results]
+        s = self.player_pos
+        if any(algo in OPTIMAL_SOLVERS for algo in missing):
+            flow_nodes, reachable, shortest, _, flow_time = self.flow_field_with_parent(s, parents=False)
+            for algo in missing:
+                if algo == "Flow field":
+                    self.stats[algo] = new_stats(flow_time, flow_nodes, shortest, reachable)
+                elif algo in OPTIMAL_SOLVERS:
+                    self.stats[algo] = new_stats(0.0, 0, shortest, reachable, derived=True)
+        searches = [algo for algo in missing if algo not in OPTIMAL_SOLVERS]
+        if self.pool is None:
+            self.stats_queue = searches
+        elif searches:
+            self.dispatch_solvers(s, searches)
+
+    def poll_missing_stats(self):
+        # Returns True once every solver has its stats.
+        if self.pending_results:
+            self.poll_solvers()
+        if self.stats_queue:
+            algo = self.stats_queue.pop(0)
+            n, succ, pl, _, comp = self.run_solver(algo, self.player_pos, parents=False)
+            self.stats[algo] = new_stats(comp, n, pl, succ)
+        return not self.pending_results and not self.stats_queue
+
+    def elapsed(self):
+        return round(self.now - (self.start_time or self.now), 3)
+
+    def run_episode(self, algo_name, max_time=MAX_EPISODE_TIME):
+        # Headless episodes tick as fast as they can; there is nothing to
+        # draw, so no accumulator is involved.
+        self.start_solver(algo_name)
+        tel = self.telemetry
+        max_ticks = round(max_time / SIM_DT)
+        while self.tick - self.episode_start < max_ticks:
+            tel.start_frame()
+            finished = self.step_waiting()
+            tel.end_frame(sim_time=round(self.now, 3))
+            if finished:
+                break
+            if not self.auto_path and not self.pending_results:
+                break
+        self.finish_episode()
+        return {
+            "solver": algo_name,
+            "result": self.result or "stuck",
+            "steps": self.steps,
+            "replans": self.stats.get(algo_name, {}).get("replans", 0),
+            "sim_time": round((self.tick - self.episode_start) * SIM_DT, 3),
+            "stats": dict(self.stats),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless Escape the Fire episodes.")
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--solver", choices=ALGORITHMS, default="A*")
+    parser.add_argument("--solvers", nargs="*", choices=ALGORITHMS, default=[],
+                        help="also run these solvers alongside --solver each episode, as the GUI does for its stats")
+    parser.add_argument("--size", type=int, default=GRID_SIZE)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--replay-dir", default=None, help="write a replay file for every episode here")
+    parser.add_argument("--telemetry", metavar="SINK", default=None,
+                        help="stream per-tick NDJSON to a file, '-' or tcp://host:port")
+    args = parser.parse_args()
+
+    telemetry = Telemetry(args.telemetry) if args.telemetry else NO_TELEMETRY
+    engine = FireEngine(grid_size=args.size, seed=args.seed, replay_dir=args.replay_dir, telemetry=telemetry,
+                        solvers=args.solvers)
+    outcomes = {}
+    t0 = time.perf_counter()
+    for i in range(args.episodes):
+        if i:
+            engine.reset_map()
+        result = engine.run_episode(args.solver)
+        outcomes[result["result"]] = outcomes.get(result["result"], 0) + 1
+    elapsed = time.perf_counter() - t0
+    print(f"{args.episodes} episodes of {args.solver} in {elapsed:.2f}s "
+          f"({args.episodes / elapsed * 60:.0f} episodes/min)")
+    for outcome, count in sorted(outcomes.items()):
+        print(f"  {outcome}: {count}")
+    rate, replans = engine.success_rate(args.solver)
+    print(f"  success rate: {rate:.1%}   replans/episode: {replans:.2f}")
+    telemetry.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import time
+import argparse
+import numpy as np
+
+from engine import FIRE_SPREAD_INTERVAL, FIRE_SPREAD_PROB, AUTO_MOVE_DELAY, OBSTACLE_DENSITY, FIRE_DENSITY
+from flowfield import FlowField, INF as UNREACHABLE
+from grid import Grid, DIRECTIONS, EMPTY, FIRE
+from mapgen import generate_map
+from solvers import a_star_with_parent
+from spread import spread_fire
+
+# Agents step once per tick; the fire spreads every few ticks, matching the
+# single-player game's move delay and spread interval.
+TICKS_PER_SPREAD = max(1, round(FIRE_SPREAD_INTERVAL / AUTO_MOVE_DELAY))
+MAX_TICKS = 5000
+
+
+def border_exits(size, count):
+    mid, last = size // 2, size - 1
+    return [(mid, 0), (mid, last), (0, mid), (last, mid), (0, 0), (last, last), (last, 0), (0, last)][:count]
+
+
+class EvacuationSim:
+    # Many agents, several exits, one shared flow field per exit. Agents
+    # never search: each tick they step to the free neighbour closest to
+    # any exit. A field is repaired only when a newly ignited cell was on it
+    # (fire can only cut paths, so cells it could not reach stay valid), and
+    # the repair touches only the cells whose distance changed.
+    def __init__(self, size, agents, exits=4, seed=None, obstacle_density=OBSTACLE_DENSITY,
+                 fire_density=FIRE_DENSITY):
+        self.rng = np.random.default_rng(seed)
+        self.grid = Grid(size)
+        self.exits = border_exits(size, exits)
+        generate_map(self.grid, self.rng, self.exits[0], self.exits[-1], obstacle_density,
+                     int(size * size * fire_density))
+        for pos in self.exits:
+            self.grid.set(pos, EMPTY)
+        self.exit_cells = {y * size + x for x, y in self.exits}
+        self.fields = [FlowField(self.grid, pos) for pos in self.exits]
+        self.combine_fields()
+
+        reachable = [i for i, d in enumerate(self.nearest) if d not in (0, UNREACHABLE)]
+        count = min(agents, len(reachable))
+        self.agents = self.rng.choice(reachable, count, replace=False).tolist()
+        self.occupied = bytearray(size * size)
+        for i in self.agents:
+            self.occupied[i] = 1
+        self.total = count
+        self.evacuated = 0
+        self.burned = 0
+        self.tick = 0
+        self.field_repairs = 0
+        self.cells_repaired = 0
+        self.plan_ns = []
+        self.move_ns = []
+
+    def combine_fields(self):
+        dists = [field.dist for field in self.fields]
+        self.nearest = [min(ds) for ds in zip(*dists)] if len(dists) > 1 else dists[0]
+
+    def spread(self):
+        xs, ys = spread_fire(self.grid.cells, self.rng, FIRE_SPREAD_PROB, exempt=self.exits)
+        ignited = (ys * self.grid.width + xs).tolist()
+        if not ignited:
+            return
+        for i in ignited:
+            if self.occupied[i]:
+                self.occupied[i] = 0
+        alive = [i for i in self.agents if self.grid.buf[i] != FIRE]
+        self.burned += len(self.agents) - len(alive)
+        self.agents = alive
+        cells = list(zip(xs.tolist(), ys.tolist()))
+        changed = False
+        for field in self.fields:
+            if any(field.dist[i] != UNREACHABLE for i in ignited):
+                field.touched = 0
+                field.notify(cells)
+                self.field_repairs += 1
+                self.cells_repaired += field.touched
+                changed = True
+        if changed:
+            self.combine_fields()
+
+    def move(self):
+        # Closest agents move first so a queue behind them can close up in the
+        # same tick. An agent takes the best free neighbour that brings it
+        # closer to an exit and otherwise waits; exits absorb any number.
+        w, h = self.grid.width, self.grid.height
+        buf, nearest, occupied, exits = self.grid.buf, self.nearest, self.occupied, self.exit_cells
+        remaining = []
+        for i in sorted(self.agents, key=nearest.__getitem__):
+            here = nearest[i]
+            best, best_d = i, here
+            x, y = i % w, i // w
+            for dx, dy in DIRECTIONS:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < w and 0 <= ny < h:
+                    j = ny * w + nx
+                    if nearest[j] < best_d and not buf[j] and not occupied[j]:
+                        best, best_d = j, nearest[j]
+            occupied[i] = 0
+            if best in exits:
+                self.evacuated += 1
+                continue
+            occupied[best] = 1
+            remaining.append(best)
+        self.agents = remaining
+
+    def step(self):
+        t0 = time.perf_counter_ns()
+        if self.tick and self.tick % TICKS_PER_SPREAD == 0:
+            self.spread()
+        t1 = time.perf_counter_ns()
+        self.move()
+        t2 = time.perf_counter_ns()
+        self.plan_ns.append(t1 - t0)
+        self.move_ns.append(t2 - t1)
+        self.tick += 1
+
+    def stranded(self):
+        return sum(self.nearest[i] == UNREACHABLE for i in self.agents)
+
+    def run(self, max_ticks=MAX_TICKS):
+        while self.agents and self.tick < max_ticks and self.stranded() < len(self.agents):
+            self.step()
+        return self.report()
+
+    def report(self):
+        plan = np.array(self.plan_ns or [0]) / 1e6
+        move = np.array(self.move_ns or [0]) / 1e6
+        # Agents left when the run ends either have no reachable exit or
+        # were still on their way when max_ticks ran out.
+        stranded = self.stranded()
+        return {
+            "agents": self.total,
+            "evacuated": self.evacuated,
+            "burned": self.burned,
+            "stranded": stranded,
+            "moving": len(self.agents) - stranded,
+            "evacuation_rate": self.evacuated / self.total if self.total else 0.0,
+            "ticks": self.tick,
+            "agents_per_tick": self.evacuated / self.tick if self.tick else 0.0,
+            "field_repairs": self.field_repairs,
+            "cells_repaired": self.cells_repaired,
+            "plan_ms_mean": float(plan.mean()),
+            "plan_ms_p95": float(np.percentile(plan, 95)),
+            "move_ms_mean": float(move.mean()),
+        }
+
+
+def per_agent_astar_ms(sim, sample=20):
+    # What one tick would cost if every agent ran its own A* to its nearest
+    # exit instead: time a sample and scale by the agent count.
+    w = sim.grid.width
+    agents = sim.agents[:sample]
+    if not agents:
+        return 0.0
+    t0 = time.perf_counter()
+    for i in agents:
+        start = (i % w, i // w)
+        goal = min(sim.exits, key=lambda e: abs(e[0] - start[0]) + abs(e[1] - start[1]))
+        a_star_with_parent(sim.grid, start, goal)
+    return (time.perf_counter() - t0) / len(agents) * len(sim.agents) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-agent evacuation: throughput and planning cost.")
+    parser.add_argument("--agents", type=int, nargs="+", default=[100, 500, 1000, 2000])
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--exits", type=int, default=4, choices=range(1, 9))
+    parser.add_argument("--obstacle-density", type=float, default=OBSTACLE_DENSITY)
+    parser.add_argument("--fire-density", type=float, default=FIRE_DENSITY)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'agents':>7} {'evacuated':>10} {'burned':>7} {'stranded':>9} {'moving':>7} {'rate':>6} {'ticks':>6} "
+          f"{'agents/tick':>12} {'repairs':>8} {'cells fixed':>12} {'plan ms/tick':>13} {'p95':>7} {'move ms/tick':>13} "
+          f"{'A*/agent ms/tick':>17}")
+    for agents in args.agents:
+        sim = EvacuationSim(args.size, agents, args.exits, args.seed, args.obstacle_density, args.fire_density)
+        naive = per_agent_astar_ms(sim)
+        r = sim.run()
+        print(f"{r['agents']:>7} {r['evacuated']:>10} {r['burned']:>7} {r['stranded']:>9} {r['moving']:>7} "
+              f"{r['evacuation_rate']:>6.1%} {r['ticks']:>6} {r['agents_per_tick']:>12.2f} {r['field_repairs']:>8} {r['cells_repaired']:>12} "
+              f"{r['plan_ms_mean']:>13.3f} {r['plan_ms_p95']:>7.3f} {r['move_ms_mean']:>13.3f} {naive:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
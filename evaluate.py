@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from engine import FireEngine, GRID_SIZE, ALGORITHMS, MAX_EPISODE_TIME
+
+SHARD = 100
+FIELDS = ("episodes", "wins", "fails", "stuck", "steps", "win_steps", "solver_time", "nodes", "replans", "sim_time")
+
+_engines = {}
+
+
+def episode_seed(seed, index):
+    # Episode i gets the same map whichever shard, worker or run plays it,
+    # and every solver in the sweep plays the same maps.
+    return int(np.random.SeedSequence([seed, index]).generate_state(1, np.uint64)[0] % 2 ** 63)
+
+
+def empty_totals(solvers):
+    return {algo: dict.fromkeys(FIELDS, 0) for algo in solvers}
+
+
+def merge(into, totals):
+    for algo, row in totals.items():
+        for field in FIELDS:
+            into[algo][field] += row[field]
+
+
+def run_shard(size, solvers, seed, start, stop, max_time):
+    # Worker side: plays episodes [start, stop) with each solver inline and
+    # sends back only the per-solver sums. One engine per worker process is
+    # kept between shards.
+    t0 = time.process_time()
+    engine = _engines.get(size)
+    if engine is None:
+        engine = _engines[size] = FireEngine(grid_size=size, solvers=())
+    totals = empty_totals(solvers)
+    for index in range(start, stop):
+        map_seed = episode_seed(seed, index)
+        for algo in solvers:
+            engine.reset_map(map_seed)
+            r = engine.run_episode(algo, max_time)
+            row = totals[algo]
+            stats = r["stats"].get(algo, {})
+            row["episodes"] += 1
+            row["wins"] += r["result"] == "win"
+            row["fails"] += r["result"] == "fail"
+            row["stuck"] += r["result"] == "stuck"
+            row["steps"] += r["steps"]
+            row["win_steps"] += r["steps"] if r["result"] == "win" else 0
+            row["solver_time"] += stats.get("time", 0.0)
+            row["nodes"] += stats.get("nodes_expanded", 0)
+            row["replans"] += r["replans"]
+            row["sim_time"] += r["sim_time"]
+    return start, stop, totals, time.process_time() - t0
+
+
+class Checkpoint:
+    # NDJSON: a header with the sweep's settings, then one line per finished
+    # shard with its sums. Lines are flushed as they are written, so a run
+    # killed at any point loses at most the shards still in flight; a torn
+    # last line is cut off on resume.
+    def __init__(self, path, config):
+        self.path = path
+        self.done = {}
+        if path and os.path.exists(path):
+            records = []
+            valid = 0
+            with open(path) as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        break
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break
+                    valid += len(line)
+            if records and records[0] != {"type": "sweep", **config}:
+                raise ValueError(f"{path} was written by a sweep with different settings: {records[0]}")
+            for rec in records[1:]:
+                self.done[rec["start"]] = rec
+            # Drop a torn last line so the next record starts on its own.
+            with open(path, "r+") as f:
+                f.truncate(valid)
+        self.file = None
+        if path:
+            self.file = open(path, "a")
+            if os.path.getsize(path) == 0:
+                self.write({"type": "sweep", **config})
+
+    def write(self, record):
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+
+    def add(self, start, stop, totals, cpu):
+        if self.file is not None:
+            self.write({"type": "shard", "start": start, "stop": stop, "totals": totals, "cpu": cpu})
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+def win_interval(wins, n):
+    # Normal-approximation 95% half-width of the win rate.
+    if not n:
+        return 0.0
+    p = wins / n
+    return 1.96 * (p * (1 - p) / n) ** 0.5
+
+
+def progress_line(done, total, elapsed, totals):
+    parts = [f"{done:>6}/{total} episodes {done / max(elapsed, 1e-9):>7.1f}/s"]
+    for algo, row in totals.items():
+        n = row["episodes"]
+        if n:
+            parts.append(f"{algo} {row['wins'] / n:.1%}±{win_interval(row['wins'], n):.1%}")
+    return " | ".join(parts)
+
+
+def print_table(totals):
+    print(f"{'solver':<11} {'episodes':>9} {'win':>7} {'±95%':>6} {'fail':>7} {'stuck':>7} {'steps':>6} "
+          f"{'win steps':>10} {'replans':>8} {'nodes':>8} {'solver ms':>10}")
+    for algo, row in totals.items():
+        n = max(row["episodes"], 1)
+        wins = max(row["wins"], 1)
+        print(f"{algo:<11} {row['episodes']:>9} {row['wins'] / n:>7.1%} {win_interval(row['wins'], n):>6.1%} "
+              f"{row['fails'] / n:>7.1%} {row['stuck'] / n:>7.1%} {row['steps'] / n:>6.1f} "
+              f"{row['win_steps'] / wins:>10.1f} {row['replans'] / n:>8.2f} {row['nodes'] / n:>8.0f} "
+              f"{row['solver_time'] / n * 1000:>10.2f}")
+
+
+def sweep(config, workers, checkpoint=None, stream=print):
+    # Runs every shard the checkpoint does not already have and returns the
+    # per-solver totals. Shards finish out of order; each is checkpointed
+    # and folded into the running totals as soon as it arrives.
+    solvers, episodes, shard = config["solvers"], config["episodes"], config["shard"]
+    totals = empty_totals(solvers)
+    done = 0
+    for rec in (checkpoint.done.values() if checkpoint else ()):
+        merge(totals, rec["totals"])
+        done += rec["stop"] - rec["start"]
+    todo = [(a, min(a + shard, episodes)) for a in range(0, episodes, shard)
+            if not checkpoint or a not in checkpoint.done]
+    if done:
+        stream(f"resuming: {done} episodes from checkpoint, {len(todo)} shards to go")
+    t0 = time.perf_counter()
+    resumed = done
+    cpu = 0.0
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        futures = [pool.submit(run_shard, config["size"], solvers, config["seed"], a, b, config["max_time"])
+                   for a, b in todo]
+        for future in as_completed(futures):
+            start, stop, shard_totals, shard_cpu = future.result()
+            merge(totals, shard_totals)
+            cpu += shard_cpu
+            done += stop - start
+            if checkpoint:
+                checkpoint.add(start, stop, shard_totals, shard_cpu)
+            stream(progress_line(done - resumed, episodes - resumed, time.perf_counter() - t0, totals))
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    return totals, time.perf_counter() - t0, cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded self-play evaluation of solver policies over seeded episodes.")
+    parser.add_argument("--episodes", type=int, default=10000)
+    parser.add_argument("--solvers", nargs="+", choices=ALGORITHMS, default=["A*", "Greedy", "BFS"])
+    parser.add_argument("--size", type=int, default=GRID_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-time", type=float, default=MAX_EPISODE_TIME, help="simulated seconds per episode")
+    parser.add_argument("--shard", type=int, default=SHARD, help="episodes per job sent to a worker")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--checkpoint", metavar="FILE", default=None,
+                        help="append finished shards here and skip the ones already in it")
+    parser.add_argument("--scaling", action="store_true",
+                        help="time the same sweep at 1, 2, 4, ... workers instead")
+    args = parser.parse_args()
+
+    config = {"seed": args.seed, "size": args.size, "solvers": args.solvers, "episodes": args.episodes,
+              "shard": args.shard, "max_time": args.max_time}
+
+    if args.scaling:
+        counts = sorted({min(2 ** k, args.workers) for k in range(args.workers.bit_length() + 1)})
+        print(f"{'workers':>8} {'wall s':>8} {'episodes/s':>11} {'speedup':>8} {'efficiency':>11}")
+        base = None
+        for workers in counts:
+            _, wall, _ = sweep(config, workers, stream=lambda line: None)
+            rate = args.episodes / wall
+            base = base or rate
+            print(f"{workers:>8} {wall:>8.2f} {rate:>11.1f} {rate / base:>7.2f}x {rate / base / workers:>11.0%}")
+        return
+
+    try:
+        checkpoint = Checkpoint(args.checkpoint, config)
+    except ValueError as e:
+        parser.error(str(e))
+    try:
+        totals, wall, cpu = sweep(config, args.workers, checkpoint)
+    except KeyboardInterrupt:
+        print("interrupted" + (f"; rerun with --checkpoint {args.checkpoint} to resume" if args.checkpoint else ""))
+        return
+    finally:
+        checkpoint.close()
+    print(f"{args.episodes} episodes x {len(args.solvers)} solvers on {args.workers} workers in {wall:.1f}s "
+          f"(worker CPU {cpu:.1f}s)")
+    print_table(totals)
+
+
+if __name__ == "__main__":
+    main()
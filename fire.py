@@ -1,625 +1,658 @@
-import pygame
-import sys
-import random
-import time
-import heapq
-from collections import deque
-
-WINDOW_WIDTH, WINDOW_HEIGHT = 900, 800
-GRID_SIZE = 20
-CELL_SIZE = 32
-TOP_BAR = 80
-PLAY_AREA_WIDTH = GRID_SIZE * CELL_SIZE
-PLAY_AREA_HEIGHT = GRID_SIZE * CELL_SIZE
-MARGIN_LEFT = (WINDOW_WIDTH - PLAY_AREA_WIDTH) // 2
-MARGIN_TOP = TOP_BAR
-
-FPS = 30
-FIRE_SPREAD_INTERVAL = 1.2
-FIRE_SPREAD_PROB = 0.22
-
-AUTO_MOVE_DELAY = 0.20
-
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-BRICK = (205, 92, 92)
-GRAY = (180, 180, 180)
-BLUE = (0, 0, 200)
-GREEN = (0, 200, 0)
-FIRE_COLOR = (255, 100, 0)
-BUTTON_BG = (230, 230, 230)
-BUTTON_BORDER = (100, 100, 100)
-GOLD = (212, 175, 55)
-
-PLAYER_IMG = "Player.png"
-BACK_BTN_IMG = "BackButton.jpeg"
-FIRE_IMG = "fire.png"
-
-def manhattan(a, b):
-    return abs(a[0] - b[0]) + abs(a[1] - b[1])
-
-class EscapeTheFire:
-    def __init__(self):
-        pygame.init()
-        pygame.display.set_caption("Escape the Fire")
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 26)
-        self.big_font = pygame.font.Font(None, 42)
-
-        self.player_img = self.load_and_scale(PLAYER_IMG, (CELL_SIZE, CELL_SIZE))
-        self.back_img = self.load_and_scale(BACK_BTN_IMG, (36, 36))
-        self.fire_img = self.load_and_scale(FIRE_IMG, (CELL_SIZE, CELL_SIZE))
-
-        self.mode = "menu"
-        self.reset_map()
-        self.buttons = {}
-        self.algo_start_time = None
-        self.last_fire_spread = time.time()
-
-    def load_and_scale(self, fname, size):
-        try:
-            img = pygame.image.load(fname).convert_alpha()
-            return pygame.transform.scale(img, size)
-        except Exception:
-            return None
-
-    def reset_map(self):
-        self.player_pos = (0, 0)
-        self.goal_pos = (GRID_SIZE - 1, GRID_SIZE - 1)
-        self.obstacles = set()
-        self.fires = set()
-        self.generate_solvable_map()
-        self.initial_state = (self.player_pos, self.goal_pos, set(self.fires), set(self.obstacles))
-        self.steps = 0
-        self.start_time = None
-        self.movement_started = False
-        self.selected_solver = None
-        self.auto_path = []
-        self.auto_step_index = 0
-        self.stats = {}
-        self.algo_start_time = None
-        self.last_fire_spread = time.time()
-        self.auto_move_delay = AUTO_MOVE_DELAY
-        self.last_auto_move_time = time.time() - self.auto_move_delay
-        self.parents_cache = {}
-
-    def generate_random_map(self):
-        self.obstacles.clear()
-        self.fires.clear()
-        for y in range(GRID_SIZE):
-            for x in range(GRID_SIZE):
-                if (x, y) in [(0, 0), (GRID_SIZE - 1, GRID_SIZE - 1)]:
-                    continue
-                if random.random() < 0.18:
-                    self.obstacles.add((x, y))
-        for i in range(GRID_SIZE):
-            if (i, i) in self.obstacles:
-                self.obstacles.remove((i, i))
-        for _ in range(int(GRID_SIZE * GRID_SIZE * 0.03)):
-            rx = random.randrange(GRID_SIZE)
-            ry = random.randrange(GRID_SIZE)
-            if (rx, ry) not in self.obstacles and (rx, ry) not in [(0,0), self.goal_pos]:
-                self.fires.add((rx, ry))
-
-    def generate_solvable_map(self):
-        attempts = 0
-        while True:
-            attempts += 1
-            self.generate_random_map()
-            if self.bfs_check_path_exists((0,0), self.goal_pos):
-                return
-            if attempts > 200:
-                self.obstacles.clear()
-                self.fires.clear()
-                for i in range(GRID_SIZE):
-                    if (i, i) in self.obstacles:
-                        self.obstacles.remove((i, i))
-                return
-
-    def bfs_check_path_exists(self, start, goal):
-        queue = deque([start])
-        visited = {start}
-        while queue:
-            cur = queue.popleft()
-            if cur == goal:
-                return True
-            for nx, ny in self.get_neighbors(cur):
-                if (nx, ny) not in visited and (nx, ny) not in self.obstacles and (nx, ny) not in self.fires:
-                    visited.add((nx, ny))
-                    queue.append((nx, ny))
-        return False
-
-    def draw_ui_top(self):
-        pygame.draw.rect(self.screen, BUTTON_BG, (0, 0, WINDOW_WIDTH, TOP_BAR))
-        title_surf = self.big_font.render("Escape the Fire", True, BLACK)
-        self.screen.blit(title_surf, (20, 12))
-        labels = ["A*", "Greedy", "BFS", "Restart", "Menu"]
-        btn_w = 96
-        btn_h = 34
-        gap = 18
-        start_x = 20
-        y = 44
-        self.buttons = {}
-        for i, label in enumerate(labels):
-            bx = start_x + i * (btn_w + gap)
-            rect = pygame.Rect(bx, y, btn_w, btn_h)
-            pygame.draw.rect(self.screen, BUTTON_BG, rect, border_radius=6)
-            pygame.draw.rect(self.screen, BUTTON_BORDER, rect, 2, border_radius=6)
-            txt = self.font.render(label, True, BLACK)
-            self.screen.blit(txt, (bx + 12, y + 8))
-            self.buttons[label] = rect
-        if self.selected_solver and self.selected_solver in self.buttons:
-            r = self.buttons[self.selected_solver]
-            pygame.draw.rect(self.screen, GOLD, r, 3, border_radius=6)
-
-    def draw_grid(self):
-        for y in range(GRID_SIZE):
-            for x in range(GRID_SIZE):
-                gx = MARGIN_LEFT + x * CELL_SIZE
-                gy = MARGIN_TOP + y * CELL_SIZE
-                rect = pygame.Rect(gx, gy, CELL_SIZE, CELL_SIZE)
-                color = WHITE
-                if (x, y) in self.obstacles:
-                    color = BRICK
-                pygame.draw.rect(self.screen, color, rect)
-                if (x, y) in self.fires:
-                    if self.fire_img:
-                        self.screen.blit(self.fire_img, (gx, gy))
-                    else:
-                        pygame.draw.rect(self.screen, FIRE_COLOR, rect)
-                if (x, y) == self.goal_pos:
-                    pygame.draw.rect(self.screen, GREEN, rect.inflate(-6, -6))
-                if (x, y) == self.player_pos:
-                    if self.player_img:
-                        self.screen.blit(self.player_img, (gx, gy))
-                    else:
-                        pygame.draw.rect(self.screen, BLUE, rect.inflate(-6, -6))
-                pygame.draw.rect(self.screen, BLACK, rect, 1)
-        self.draw_path_arrows()
-
-    def get_neighbors(self, pos):
-        x, y = pos
-        for dx, dy in [(1,0),(-1,0),(0,1),(0,-1)]:
-            nx, ny = x+dx, y+dy
-            if 0 <= nx < GRID_SIZE and 0 <= ny < GRID_SIZE:
-                yield (nx, ny)
-
-    def bfs_search_with_parent(self, start):
-        t0 = time.time()
-        queue = deque([start])
-        visited = {start}
-        parent = {}
-        nodes = 0
-        while queue:
-            nodes += 1
-            cur = queue.popleft()
-            if cur == self.goal_pos:
-                length = 0
-                p = cur
-                while p in parent:
-                    p = parent[p]
-                    length += 1
-                comp_time = time.time() - t0
-                return nodes, True, length, parent, comp_time
-            for nb in self.get_neighbors(cur):
-                if nb not in visited and nb not in self.obstacles and nb not in self.fires:
-                    visited.add(nb)
-                    parent[nb] = cur
-                    queue.append(nb)
-        comp_time = time.time() - t0
-        return nodes, False, 0, parent, comp_time
-
-    def greedy_with_parent(self, start):
-        t0 = time.time()
-        pq = []
-        heapq.heappush(pq, (manhattan(start, self.goal_pos), start))
-        visited = {start}
-        parent = {}
-        nodes = 0
-        while pq:
-            nodes += 1
-            _, cur = heapq.heappop(pq)
-            if cur == self.goal_pos:
-                length = 0
-                p = cur
-                while p in parent:
-                    p = parent[p]
-                    length += 1
-                comp_time = time.time() - t0
-                return nodes, True, length, parent, comp_time
-            for nb in self.get_neighbors(cur):
-                if nb not in visited and nb not in self.obstacles and nb not in self.fires:
-                    visited.add(nb)
-                    parent[nb] = cur
-                    heapq.heappush(pq, (manhattan(nb, self.goal_pos), nb))
-        comp_time = time.time() - t0
-        return nodes, False, 0, parent, comp_time
-
-    def a_star_with_parent(self, start):
-        start_time = time.time()
-        open_set = []
-        g_score = {start: 0}
-        heapq.heappush(open_set, (manhattan(start, self.goal_pos), start))
-        parent = {}
-        nodes = 0
-        closed = set()
-        while open_set:
-            nodes += 1
-            _, cur = heapq.heappop(open_set)
-            if cur in closed:
-                continue
-            if cur == self.goal_pos:
-                length = 0
-                p = cur
-                while p in parent:
-                    p = parent[p]
-                    length += 1
-                comp_time = time.time() - start_time
-                return nodes, True, length, parent, comp_time
-            closed.add(cur)
-            for nb in self.get_neighbors(cur):
-                if nb in self.obstacles or nb in self.fires:
-                    continue
-                tentative_g = g_score[cur] + 1
-                if nb not in g_score or tentative_g < g_score[nb]:
-                    g_score[nb] = tentative_g
-                    parent[nb] = cur
-                    heapq.heappush(open_set, (tentative_g + manhattan(nb, self.goal_pos), nb))
-        comp_time = time.time() - start_time
-        return nodes, False, 0, parent, comp_time
-
-    def reconstruct_path_from_parent(self, parent, start_override=None):
-        cur = self.goal_pos
-        path = []
-        while cur in parent:
-            path.append(cur)
-            cur = parent[cur]
-        path.reverse()
-        if start_override and path and path[0] == start_override:
-            path = path[1:]
-        if path and path[0] == self.player_pos:
-            path = path[1:]
-        return path
-
-    def start_solver(self, algo_name):
-        self.pending_solver = algo_name
-        self.start_movement(trigger="solver")
-
-    def start_movement(self, trigger="manual"):
-        if self.movement_started:
-            return
-        self.movement_started = True
-        self.algo_start_time = time.time()
-        s = self.player_pos
-        a_nodes, a_succ, a_len, a_parent, a_time = self.a_star_with_parent(s)
-        self.stats["A*"] = {"time": round(a_time, 3), "nodes_expanded": a_nodes, "path_length": a_len, "success": a_succ}
-        self.parents_cache["A*"] = a_parent
-        g_nodes, g_succ, g_len, g_parent, g_time = self.greedy_with_parent(s)
-        self.stats["Greedy"] = {"time": round(g_time, 3), "nodes_expanded": g_nodes, "path_length": g_len, "success": g_succ}
-        self.parents_cache["Greedy"] = g_parent
-        b_nodes, b_succ, b_len, b_parent, b_time = self.bfs_search_with_parent(s)
-        self.stats["BFS"] = {"time": round(b_time, 3), "nodes_expanded": b_nodes, "path_length": b_len, "success": b_succ}
-        self.parents_cache["BFS"] = b_parent
-        chosen = getattr(self, "pending_solver", None)
-        if chosen:
-            self.selected_solver = chosen
-            parent = self.parents_cache.get(chosen, {})
-            main_path = self.reconstruct_path_from_parent(parent, start_override=self.player_pos)
-            if main_path:
-                self.auto_path = main_path
-                self.auto_step_index = 0
-                self.last_auto_move_time = time.time() - self.auto_move_delay
-            else:
-                self.auto_path = []
-                self.auto_step_index = 0
-            delattr(self, "pending_solver")
-
-    def spread_fire_step(self):
-        new_fires = set(self.fires)
-        for (fx, fy) in list(self.fires):
-            for nx, ny in self.get_neighbors((fx, fy)):
-                if (nx, ny) in self.obstacles or (nx, ny) in self.fires or (nx, ny) == self.player_pos or (nx, ny) == self.goal_pos:
-                    continue
-                if random.random() < FIRE_SPREAD_PROB:
-                    new_fires.add((nx, ny))
-        self.fires = new_fires
-
-    def move_player(self, dx, dy):
-        if not self.start_time:
-            self.start_time = time.time()
-        if not self.movement_started:
-            self.start_movement(trigger="manual")
-        x, y = self.player_pos
-        nx, ny = x + dx, y + dy
-        if 0 <= nx < GRID_SIZE and 0 <= ny < GRID_SIZE and (nx, ny) not in self.obstacles:
-            self.player_pos = (nx, ny)
-            self.steps += 1
-            if self.auto_path:
-                self.auto_path = []
-                self.auto_step_index = 0
-                self.selected_solver = None
-
-    def draw_path_arrows(self):
-        if not self.auto_path or self.auto_step_index >= len(self.auto_path):
-            return
-        path_remaining = self.auto_path[self.auto_step_index:]
-        prev = self.player_pos
-        for idx, pos in enumerate(path_remaining):
-            x, y = pos
-            gx = MARGIN_LEFT + x * CELL_SIZE
-            gy = MARGIN_TOP + y * CELL_SIZE
-            rect = pygame.Rect(gx, gy, CELL_SIZE, CELL_SIZE)
-            dx = pos[0] - prev[0]
-            dy = pos[1] - prev[1]
-            center = (gx + CELL_SIZE // 2, gy + CELL_SIZE // 2)
-            size = CELL_SIZE // 3
-            if (x, y) == self.player_pos:
-                prev = pos
-                continue
-            if dx == 1 and dy == 0:
-                points = [(center[0]-size, center[1]-size), (center[0]-size, center[1]+size), (center[0]+size, center[1])]
-            elif dx == -1 and dy == 0:
-                points = [(center[0]+size, center[1]-size), (center[0]+size, center[1]+size), (center[0]-size, center[1])]
-            elif dx == 0 and dy == 1:
-                points = [(center[0]-size, center[1]-size), (center[0]+size, center[1]-size), (center[0], center[1]+size)]
-            else:
-                points = [(center[0]-size, center[1]+size), (center[0]+size, center[1]+size), (center[0], center[1]-size)]
-            pygame.draw.polygon(self.screen, BLACK, points)
-            prev = pos
-
-    def draw_end_game_comparison(self):
-        dim = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-        dim.fill((0, 0, 0, 150))
-        self.screen.blit(dim, (0, 0))
-        overlay_rect = pygame.Rect(40, 60, WINDOW_WIDTH - 80, WINDOW_HEIGHT - 160)
-        pygame.draw.rect(self.screen, (250, 250, 250), overlay_rect, border_radius=10)
-        pygame.draw.rect(self.screen, (40, 40, 40), overlay_rect, 2, border_radius=10)
-        title = "End of Level - Comparison"
-        title_surf = self.big_font.render(title, True, BLACK)
-        self.screen.blit(title_surf, (overlay_rect.x + 20, overlay_rect.y + 12))
-        lh = 36
-        top_y = overlay_rect.y + 70
-        start_x = overlay_rect.x + 60
-        col_w = 240
-        algos = ["A*", "Greedy", "BFS"]
-        for i, algo in enumerate(algos):
-            x = start_x + i * col_w
-            self.screen.blit(self.font.render(algo, True, BLACK), (x, top_y))
-            if algo in self.stats:
-                s = self.stats[algo]
-                row1 = f"Time: {s['time']}s    Nodes: {s['nodes_expanded']}"
-                row2 = f"Path: {s['path_length']}    {'Success' if s['success'] else 'No Path'}"
-                self.screen.blit(self.font.render(row1, True, BLACK), (x, top_y + lh))
-                self.screen.blit(self.font.render(row2, True, BLACK), (x, top_y + 2 * lh))
-            else:
-                self.screen.blit(self.font.render("Not run", True, BLACK), (x, top_y + lh))
-        manual_y = top_y + 4 * lh + 10
-        mt1 = f"Manual Steps: {self.steps}"
-        mt2 = f"Manual Time: {round((time.time() - (self.start_time or time.time())), 3)}s"
-        t1s = self.font.render(mt1, True, BLUE)
-        t2s = self.font.render(mt2, True, BLUE)
-        cx = overlay_rect.centerx
-        self.screen.blit(t1s, (cx - t1s.get_width() // 2, manual_y))
-        self.screen.blit(t2s, (cx - t2s.get_width() // 2, manual_y + lh))
-        failed = False
-        fail_msg = ""
-        if self.player_pos in self.fires:
-            failed = True
-            fail_msg = "You failed (stepped into fire)"
-        else:
-            alg_results = [self.stats.get(a, {}).get("success", None) for a in algos]
-            if all(r is not None for r in alg_results) and not any(alg_results) and self.player_pos != self.goal_pos:
-                failed = True
-                fail_msg = "You failed (no solution found by algorithms)"
-        if failed:
-            fm = self.big_font.render(fail_msg, True, (200, 30, 30))
-            self.screen.blit(fm, (overlay_rect.centerx - fm.get_width()//2, manual_y + 2*lh + 8))
-        btn_w, btn_h = 140, 44
-        bx = overlay_rect.centerx - btn_w - 12
-        by = overlay_rect.bottom - 70
-        rbtn = pygame.Rect(bx, by, btn_w, btn_h)
-        mbtn = pygame.Rect(overlay_rect.centerx + 12, by, btn_w, btn_h)
-        pygame.draw.rect(self.screen, BUTTON_BG, rbtn, border_radius=8)
-        pygame.draw.rect(self.screen, BUTTON_BORDER, rbtn, 2, border_radius=8)
-        pygame.draw.rect(self.screen, BUTTON_BG, mbtn, border_radius=8)
-        pygame.draw.rect(self.screen, BUTTON_BORDER, mbtn, 2, border_radius=8)
-        self.screen.blit(self.font.render("Restart", True, BLACK), (rbtn.x + 34, rbtn.y + 12))
-        self.screen.blit(self.font.render("Menu", True, BLACK), (mbtn.x + 50, mbtn.y + 12))
-        return rbtn, mbtn
-
-    def handle_menu(self):
-        self.screen.fill(WHITE)
-        title = self.big_font.render("Escape the Fire", True, BLACK)
-        self.screen.blit(title, (WINDOW_WIDTH//2 - title.get_width()//2, 80))
-        btn_w, btn_h = 220, 48
-        spacing = 18
-        start_y = 200
-        buttons = [("Start Game", WINDOW_WIDTH//2 - btn_w//2, start_y),
-                   ("Instructions", WINDOW_WIDTH//2 - btn_w//2, start_y + btn_h + spacing),
-                   ("Quit", WINDOW_WIDTH//2 - btn_w//2, start_y + 2*(btn_h + spacing))]
-        self.menu_buttons = {}
-        for label, bx, by in buttons:
-            rect = pygame.Rect(bx, by, btn_w, btn_h)
-            pygame.draw.rect(self.screen, BUTTON_BG, rect, border_radius=6)
-            pygame.draw.rect(self.screen, BUTTON_BORDER, rect, 2, border_radius=6)
-            txt = self.font.render(label, True, BLACK)
-            self.screen.blit(txt, (bx + 16, by + 12))
-            self.menu_buttons[label] = rect
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); sys.exit()
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                pos = event.pos
-                if self.menu_buttons["Start Game"].collidepoint(pos):
-                    self.reset_map()
-                    self.mode = "playing"
-                    self.start_time = None
-                elif self.menu_buttons["Instructions"].collidepoint(pos):
-                    self.mode = "instructions"
-                elif self.menu_buttons["Quit"].collidepoint(pos):
-                    pygame.quit(); sys.exit()
-
-    def handle_instructions(self):
-        self.screen.fill(WHITE)
-        title = self.big_font.render("Instructions", True, BLACK)
-        self.screen.blit(title, (WINDOW_WIDTH//2 - title.get_width()//2, 40))
-        ins = [
-            "Use arrow keys to move.",
-            "Use the A*, Greedy, or BFS buttons to auto-solve (auto-movement).",
-            "When you choose a solver or start moving manually, all algorithms will start computing",
-            "Fires spread every few seconds — avoid them.",
-            "If you reach the goal you win. If you step into fire you fail.",
-            "Use Back to return to the main menu."
-        ]
-        for i, line in enumerate(ins):
-            t = self.font.render(line, True, BLACK)
-            self.screen.blit(t, (80, 120 + i*36))
-        bx, by = 40, WINDOW_HEIGHT - 80
-        back_rect = pygame.Rect(bx, by, 140, 48)
-        pygame.draw.rect(self.screen, BUTTON_BG, back_rect, border_radius=6)
-        pygame.draw.rect(self.screen, BUTTON_BORDER, back_rect, 2, border_radius=6)
-        if self.back_img:
-            self.screen.blit(self.back_img, (bx + 8, by + 6))
-            self.screen.blit(self.font.render("Back", True, BLACK), (bx + 52, by + 14))
-        else:
-            self.screen.blit(self.font.render("Back", True, BLACK), (bx + 16, by + 14))
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); sys.exit()
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                if back_rect.collidepoint(event.pos):
-                    self.mode = "menu"
-
-    def handle_playing(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mx, my = event.pos
-                for label, rect in self.buttons.items():
-                    if rect.collidepoint((mx, my)):
-                        if label in ("A*", "Greedy", "BFS"):
-                            self.start_solver(label)
-                        elif label == "Restart":
-                            self.reset_map()
-                            self.mode = "playing"
-                        elif label == "Menu":
-                            self.mode = "menu"
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    self.move_player(0, -1)
-                elif event.key == pygame.K_DOWN:
-                    self.move_player(0, 1)
-                elif event.key == pygame.K_LEFT:
-                    self.move_player(-1, 0)
-                elif event.key == pygame.K_RIGHT:
-                    self.move_player(1, 0)
-
-        now = time.time()
-        if now - self.last_fire_spread >= FIRE_SPREAD_INTERVAL:
-            self.spread_fire_step()
-            self.last_fire_spread = now
-
-        if self.auto_path and self.selected_solver:
-            if time.time() - self.last_auto_move_time >= self.auto_move_delay:
-                if self.auto_step_index >= len(self.auto_path):
-                    self.auto_path = []
-                    self.auto_step_index = 0
-                else:
-                    next_pos = self.auto_path[self.auto_step_index]
-                    if next_pos in self.obstacles or next_pos in self.fires:
-                        if self.selected_solver == "A*":
-                            n, succ, pl, parent, comp_time = self.a_star_with_parent(self.player_pos)
-                            if "A*" not in self.stats:
-                                self.stats["A*"] = {"time": 0.0, "nodes_expanded": 0, "path_length": 0, "success": False}
-                            self.stats["A*"]["time"] = round(self.stats["A*"]["time"] + comp_time, 3)
-                            self.stats["A*"]["nodes_expanded"] = self.stats["A*"]["nodes_expanded"] + n
-                            self.stats["A*"]["path_length"] = pl
-                            self.stats["A*"]["success"] = succ
-                            if succ:
-                                new_path = self.reconstruct_path_from_parent(parent, start_override=self.player_pos)
-                                self.auto_path = new_path
-                                self.auto_step_index = 0
-                                self.last_auto_move_time = time.time() - self.auto_move_delay
-                            else:
-                                self.auto_path = []
-                                self.auto_step_index = 0
-                                self.selected_solver = None
-                                self.stats["A*"]["success"] = False
-                        else:
-                            self.auto_path = []
-                            self.auto_step_index = 0
-                            if self.selected_solver not in self.stats:
-                                self.stats[self.selected_solver] = {"time": 0.0, "nodes_expanded": 0, "path_length": 0, "success": False}
-                            self.selected_solver = None
-                    else:
-                        if not self.start_time:
-                            self.start_time = time.time()
-                        self.player_pos = next_pos
-                        self.auto_step_index += 1
-                        self.last_auto_move_time = time.time()
-                        self.steps += 1
-
-        if self.player_pos == self.goal_pos or self.player_pos in self.fires:
-            self.mode = "result"
-
-        self.screen.fill(WHITE)
-        self.draw_ui_top()
-        self.draw_grid()
-        hud = self.font.render(f"Steps: {self.steps}   Time: {round((time.time() - (self.start_time or time.time())), 3)}s", True, BLACK)
-        self.screen.blit(hud, (WINDOW_WIDTH - hud.get_width() - 20, 12))
-        pygame.display.flip()
-
-    def handle_result(self):
-        if "A*" not in self.stats or "Greedy" not in self.stats or "BFS" not in self.stats:
-            s = self.player_pos
-            n, succ, pl, _, comp = self.a_star_with_parent(s)
-            self.stats["A*"] = {"time": round(comp, 3), "nodes_expanded": n, "path_length": pl, "success": succ}
-            t0 = time.time()
-            n, succ, pl, _, compg = self.greedy_with_parent(s)
-            self.stats["Greedy"] = {"time": round(compg, 3), "nodes_expanded": n, "path_length": pl, "success": succ}
-            t0 = time.time()
-            n, succ, pl, _, compb = self.bfs_search_with_parent(s)
-            self.stats["BFS"] = {"time": round(compb, 3), "nodes_expanded": n, "path_length": pl, "success": succ}
-
-        self.screen.fill(WHITE)
-        self.draw_ui_top()
-        self.draw_grid()
-        rbtn, mbtn = self.draw_end_game_comparison()
-        pygame.display.flip()
-
-        waiting = True
-        while waiting:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit(); sys.exit()
-                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    if rbtn.collidepoint(event.pos):
-                        self.reset_map()
-                        self.mode = "playing"
-                        waiting = False
-                    elif mbtn.collidepoint(event.pos):
-                        self.mode = "menu"
-                        waiting = False
-            self.clock.tick(FPS)
-
-    def run(self):
-        while True:
-            if self.mode == "menu":
-                self.handle_menu()
-            elif self.mode == "instructions":
-                self.handle_instructions()
-            elif self.mode == "playing":
-                self.handle_playing()
-            elif self.mode == "result":
-                self.handle_result()
-            else:
-                self.mode = "menu"
-            self.clock.tick(FPS)
-
-if __name__ == "__main__":
-    game = EscapeTheFire()
-    game.run()
\ No newline at end of file
+import pygame
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from engine import FireEngine, GRID_SIZE, ALGORITHMS, make_solver_pool
+from telemetry import Telemetry, NO_TELEMETRY
+from grid import WALL, FIRE, DIRECTIONS
+
+WINDOW_WIDTH, WINDOW_HEIGHT = 900, 800
+CELL_SIZE = 32
+BUTTON_LABELS = ALGORITHMS + ["Restart", "Menu"]
+BUTTON_W, BUTTON_H, BUTTON_GAP = 104, 34, 10
+BUTTONS_PER_ROW = (WINDOW_WIDTH - 20) // (BUTTON_W + BUTTON_GAP)
+BUTTON_ROWS = -(-len(BUTTON_LABELS) // BUTTONS_PER_ROW)
+TOP_BAR = 44 + BUTTON_ROWS * (BUTTON_H + 6)
+PLAY_AREA_WIDTH = GRID_SIZE * CELL_SIZE
+PLAY_AREA_HEIGHT = GRID_SIZE * CELL_SIZE
+MARGIN_LEFT = (WINDOW_WIDTH - PLAY_AREA_WIDTH) // 2
+MARGIN_TOP = TOP_BAR
+HUD_RECT = pygame.Rect(260, 0, WINDOW_WIDTH - 260, 44)
+
+FPS = 30
+# Simulation speed multipliers cycled with F; None ticks as fast as the CPU
+# allows and only draws every FAST_FORWARD_BUDGET seconds.
+SPEEDS = [1, 10, None]
+FAST_FORWARD_BUDGET = 0.25
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+BRICK = (205, 92, 92)
+GRAY = (180, 180, 180)
+BLUE = (0, 0, 200)
+GREEN = (0, 200, 0)
+FIRE_COLOR = (255, 100, 0)
+BUTTON_BG = (230, 230, 230)
+BUTTON_BORDER = (100, 100, 100)
+GOLD = (212, 175, 55)
+HEAT_COLOR = (255, 140, 0)
+# The heat map shows the chance each cell is burning this many spreads
+# from now, in steps of 1/HEAT_LEVELS so small changes don't repaint.
+HEAT_SPREADS = 3
+HEAT_LEVELS = 8
+HEAT_MAX_ALPHA = 200
+
+RESULT_COLUMNS = [("Solver", 0), ("Time", 110), ("Nodes", 190), ("Path", 260), ("Replans", 320),
+                  ("Per replan", 395), ("Result", 485), ("Win rate", 580), ("Replans/ep", 665)]
+RESULT_WORDS = ["Not run", "computing…", "Success", "No Path", "–"]
+DERIVED_NOTE = "– not run: length and result read off the flow field"
+
+PLAYER_IMG = "Player.png"
+BACK_BTN_IMG = "BackButton.jpeg"
+FIRE_IMG = "fire.png"
+ASSETS = [(PLAYER_IMG, (CELL_SIZE, CELL_SIZE)), (BACK_BTN_IMG, (36, 36)), (FIRE_IMG, (CELL_SIZE, CELL_SIZE))]
+
+
+def load_and_scale(fname, size):
+    # Runs on the loader thread, so the image is left in its file format;
+    # converting needs the display and is done on the main thread.
+    try:
+        return pygame.transform.scale(pygame.image.load(fname), size)
+    except Exception:
+        return None
+
+
+def load_assets():
+    return [load_and_scale(fname, size) for fname, size in ASSETS]
+
+
+class EscapeTheFire:
+    def __init__(self, solver_pool="thread", replay_dir=None, telemetry=NO_TELEMETRY):
+        # Only what the menu needs is set up before its first frame: no
+        # audio, and the images and the engine with its first map come from
+        # a loader thread while the menu is up.
+        pygame.display.init()
+        pygame.font.init()
+        pygame.display.set_caption("Escape the Fire")
+        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.clock = pygame.time.Clock()
+        self.font = pygame.font.Font(None, 26)
+        self.big_font = pygame.font.Font(None, 42)
+        self.small_font = pygame.font.Font(None, 22)
+
+        self.player_img = self.back_img = self.fire_img = None
+        self.loader = ThreadPoolExecutor(max_workers=1)
+        self.assets = self.loader.submit(load_assets)
+        self.engine = None
+        self.first_engine = self.loader.submit(FireEngine, grid_size=GRID_SIZE, pool=make_solver_pool(solver_pool),
+                                               replay_dir=replay_dir, telemetry=telemetry)
+        self.loader.shutdown(wait=False)
+
+        self.mode = "menu"
+        self.telemetry = telemetry
+        self.buttons = {}
+        self.frame_dt = 0.0
+        self.background = None
+        self.show_heatmap = False
+        self.heat_cache = (None, {})
+        self.speed = SPEEDS[0]
+        # Menu and instructions never change, so each is rendered once and
+        # kept as (surface, buttons); shown_mode is the screen currently on
+        # the display, and result_base the frozen grid under the overlay.
+        self.static_screens = {}
+        self.shown_mode = None
+        self.result_base = None
+        self.drawn_result = None
+        self.build_atlas()
+        # Text that never changes, rendered once.
+        self.title_label = self.big_font.render("Escape the Fire", True, BLACK)
+        self.result_title = self.big_font.render("End of Level - Comparison", True, BLACK)
+        self.labels = {text: self.font.render(text, True, BLACK) for text in BUTTON_LABELS}
+        self.small_labels = {text: self.small_font.render(text, True, BLACK)
+                             for text in [c for c, _ in RESULT_COLUMNS] + ALGORITHMS + RESULT_WORDS}
+        self.derived_note = self.small_font.render(DERIVED_NOTE, True, GRAY)
+
+    def build_atlas(self):
+        # Every cell sprite is rendered once, side by side, into one of two
+        # surfaces: opaque tiles in the display's format, so blitting them
+        # is a plain copy, and overlays with per-pixel alpha. A cell is then
+        # a few (atlas, dest, area) entries, and a frame's worth of cells
+        # goes to the screen in one Surface.blits call.
+        opaque = ["empty", "wall", "goal"]
+        overlays = ["fire", "player"] + [("arrow", d) for d in DIRECTIONS]
+        overlays += [("heat", level) for level in range(1, HEAT_LEVELS + 1)]
+        self.sprites = {}
+        for names, flags in ((opaque, 0), (overlays, pygame.SRCALPHA)):
+            atlas = pygame.Surface((CELL_SIZE * len(names), CELL_SIZE), flags)
+            for i, name in enumerate(names):
+                self.paint_sprite(atlas.subsurface((i * CELL_SIZE, 0, CELL_SIZE, CELL_SIZE)), name)
+            atlas = atlas.convert_alpha() if flags else atlas.convert()
+            for i, name in enumerate(names):
+                self.sprites[name] = (atlas, pygame.Rect(i * CELL_SIZE, 0, CELL_SIZE, CELL_SIZE))
+        self.cell_rects = {(x, y): pygame.Rect(MARGIN_LEFT + x * CELL_SIZE, MARGIN_TOP + y * CELL_SIZE,
+                                               CELL_SIZE, CELL_SIZE)
+                           for y in range(GRID_SIZE) for x in range(GRID_SIZE)}
+
+    def paint_sprite(self, tile, name):
+        rect = tile.get_rect()
+        kind = name[0] if isinstance(name, tuple) else name
+        if kind in ("empty", "goal"):
+            tile.fill(WHITE)
+        elif kind == "wall":
+            tile.fill(BRICK)
+        if kind == "goal":
+            pygame.draw.rect(tile, GREEN, rect.inflate(-6, -6))
+        elif kind in ("fire", "player"):
+            img = self.fire_img if kind == "fire" else self.player_img
+            if img:
+                # Added onto the transparent tile, so its pixels are copied
+                # as they are rather than blended with the empty background.
+                tile.blit(img, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+            elif kind == "fire":
+                tile.fill(FIRE_COLOR)
+            else:
+                tile.fill(BLUE, rect.inflate(-6, -6))
+        elif kind == "heat":
+            tile.fill(HEAT_COLOR + (HEAT_MAX_ALPHA * name[1] // HEAT_LEVELS,))
+        elif kind == "arrow":
+            (dx, dy), (cx, cy), size = name[1], rect.center, CELL_SIZE // 3
+            if dx:
+                points = [(cx - dx * size, cy - size), (cx - dx * size, cy + size), (cx + dx * size, cy)]
+            else:
+                points = [(cx - size, cy - dy * size), (cx + size, cy - dy * size), (cx, cy + dy * size)]
+            pygame.draw.polygon(tile, BLACK, points)
+        # Anything that covers a whole cell keeps the grid line on top of it.
+        if kind in ("empty", "wall", "goal", "fire", "heat"):
+            pygame.draw.rect(tile, BLACK, rect, 1)
+
+    def sprite(self, name, rect):
+        atlas, area = self.sprites[name]
+        return atlas, rect, area
+
+    def poll_assets(self, wait=False):
+        # Installs the images once the loader has them, and repaints what
+        # was drawn without them: the fire and player sprites, the
+        # instructions screen and the grid.
+        if self.assets is None or not (wait or self.assets.done()):
+            return
+        images = [img.convert_alpha() if img else None for img in self.assets.result()]
+        self.player_img, self.back_img, self.fire_img = images
+        self.assets = None
+        self.build_atlas()
+        self.static_screens.pop("instructions", None)
+        if self.shown_mode in ("instructions", "playing"):
+            self.shown_mode = None
+
+    def reset_map(self):
+        if self.engine is None:
+            # The first map was generated along with the engine on the
+            # loader thread, so Start Game uses it as it is.
+            self.engine = self.first_engine.result()
+        else:
+            self.engine.reset_map()
+        self.background = None
+
+    def draw_ui_top(self):
+        pygame.draw.rect(self.screen, BUTTON_BG, (0, 0, WINDOW_WIDTH, TOP_BAR))
+        self.screen.blit(self.title_label, (20, 12))
+        start_x = 20
+        self.buttons = {}
+        for i, label in enumerate(BUTTON_LABELS):
+            row, col = divmod(i, BUTTONS_PER_ROW)
+            bx = start_x + col * (BUTTON_W + BUTTON_GAP)
+            by = 44 + row * (BUTTON_H + 6)
+            rect = pygame.Rect(bx, by, BUTTON_W, BUTTON_H)
+            pygame.draw.rect(self.screen, BUTTON_BG, rect, border_radius=6)
+            pygame.draw.rect(self.screen, BUTTON_BORDER, rect, 2, border_radius=6)
+            txt = self.labels[label]
+            self.screen.blit(txt, txt.get_rect(center=rect.center))
+            self.buttons[label] = rect
+        selected = self.engine.selected_solver
+        if selected and selected in self.buttons:
+            r = self.buttons[selected]
+            pygame.draw.rect(self.screen, GOLD, r, 3, border_radius=6)
+
+    def draw_static_grid(self):
+        e = self.engine
+        walls = e.grid.mask(WALL)
+        cells = []
+        for y in range(GRID_SIZE):
+            for x in range(GRID_SIZE):
+                name = "wall" if walls[y, x] else "goal" if (x, y) == e.goal_pos else "empty"
+                cells.append(self.sprite(name, self.cell_rect((x, y))))
+        self.screen.blits(cells, doreturn=False)
+
+    def draw_grid(self):
+        self.draw_static_grid()
+        arrows = self.path_arrows()
+        heat = self.heat_cells()
+        cells = []
+        for pos in self.dynamic_cells(arrows, heat):
+            self.cell_sprites(pos, arrows, heat, cells)
+        cells.append(self.sprite("player", self.cell_rect(self.engine.player_pos)))
+        self.screen.blits(cells, doreturn=False)
+
+    def dynamic_cells(self, arrows, heat):
+        e = self.engine
+        return set(e.grid.positions(FIRE)) | set(arrows) | set(heat) | {e.player_pos, e.prev_player_pos}
+
+    def heat_cells(self):
+        e = self.engine
+        if not self.show_heatmap:
+            return {}
+        # The risk map only changes when the fire spreads.
+        key = (e.episode_seed, e.fire_tick)
+        if self.heat_cache[0] != key:
+            burn = e.risk_map().at_step(HEAT_SPREADS)
+            levels = np.ceil(np.minimum(burn, 1.0) * HEAT_LEVELS).astype(np.int8)
+            levels[e.grid.cells.reshape(-1) != 0] = 0
+            w = e.grid.width
+            self.heat_cache = (key, {(i % w, i // w): int(levels[i]) for i in np.flatnonzero(levels).tolist()})
+        return self.heat_cache[1]
+
+    def cell_sprites(self, pos, arrows, heat, out):
+        # Appends the blit entries for what sits on a cell over the static
+        # background.
+        rect = self.cell_rects[pos]
+        if pos in heat:
+            atlas, area = self.sprites[("heat", heat[pos])]
+            out.append((atlas, rect, area))
+        if self.engine.grid.get(pos) == FIRE:
+            atlas, area = self.sprites["fire"]
+            out.append((atlas, rect, area))
+        if pos in arrows and pos != self.engine.player_pos:
+            atlas, area = self.sprites[("arrow", arrows[pos])]
+            out.append((atlas, rect, area))
+
+    def player_rect(self):
+        # The engine moves the player a whole cell at a time; on screen the
+        # sprite slides there over one move delay.
+        e = self.engine
+        t = e.move_progress()
+        (px, py), (cx, cy) = e.prev_player_pos, e.player_pos
+        x, y = px + (cx - px) * t, py + (cy - py) * t
+        return pygame.Rect(MARGIN_LEFT + round(x * CELL_SIZE), MARGIN_TOP + round(y * CELL_SIZE), CELL_SIZE, CELL_SIZE)
+
+    def cell_rect(self, pos):
+        return self.cell_rects[pos]
+
+    def path_arrows(self):
+        e = self.engine
+        arrows = {}
+        if not e.auto_path or e.auto_step_index >= len(e.auto_path):
+            return arrows
+        prev = e.player_pos
+        for pos in e.auto_path[e.auto_step_index:]:
+            if pos != e.player_pos:
+                arrows[pos] = (pos[0] - prev[0], pos[1] - prev[1])
+            prev = pos
+        return arrows
+
+    def draw_hud(self):
+        e = self.engine
+        self.screen.blit(self.background, HUD_RECT, HUD_RECT)
+        self.screen.set_clip(HUD_RECT)
+        speed = "" if self.speed == 1 else f"   Speed: {self.speed}×" if self.speed else "   Speed: max"
+        hud = self.font.render(f"Steps: {e.steps}   Time: {e.elapsed()}s{speed}", True, BLACK)
+        self.screen.blit(hud, (WINDOW_WIDTH - hud.get_width() - 20, 12))
+        if e.pending_results:
+            pending = self.small_font.render("computing… " + ", ".join(e.pending_results), True, BUTTON_BORDER)
+            self.screen.blit(pending, (WINDOW_WIDTH - pending.get_width() - 20, 28))
+        self.screen.set_clip(None)
+
+    def render_playing(self):
+        # The top bar, walls, goal and grid lines are cached in
+        # self.background; each frame only the cells whose fire, player or
+        # arrow state changed since the last frame are repainted from it.
+        e = self.engine
+        arrows = self.path_arrows()
+        heat = self.heat_cells()
+        player_rect = self.player_rect()
+        player_cells = {e.prev_player_pos, e.player_pos}
+        hud_state = (e.steps, e.elapsed(), tuple(e.pending_results), self.speed)
+        if self.background is None or e.selected_solver != self.drawn_selected:
+            self.screen.fill(WHITE)
+            self.draw_ui_top()
+            self.draw_static_grid()
+            self.background = self.screen.copy()
+            cells = []
+            for pos in self.dynamic_cells(arrows, heat):
+                self.cell_sprites(pos, arrows, heat, cells)
+            cells.append(self.sprite("player", player_rect))
+            self.screen.blits(cells, doreturn=False)
+            self.draw_hud()
+            self.telemetry.mark("draw")
+            pygame.display.flip()
+            self.telemetry.mark("flip")
+        else:
+            dirty = set()
+            if e.fire_tick != self.drawn_fire_tick:
+                ys, xs = np.nonzero(e.grid.mask(FIRE) != self.drawn_fires)
+                dirty.update(zip(xs.tolist(), ys.tolist()))
+            if player_rect != self.drawn_player:
+                dirty.update(self.drawn_player_cells)
+            for pos in set(arrows) | set(self.drawn_arrows):
+                if arrows.get(pos) != self.drawn_arrows.get(pos):
+                    dirty.add(pos)
+            if heat is not self.drawn_heat:
+                for pos in set(heat) | set(self.drawn_heat):
+                    if heat.get(pos) != self.drawn_heat.get(pos):
+                        dirty.add(pos)
+            if player_rect != self.drawn_player or dirty & player_cells:
+                dirty.update(player_cells)
+            rects = []
+            cells = []
+            for pos in dirty:
+                rect = self.cell_rect(pos)
+                cells.append((self.background, rect, rect))
+                self.cell_sprites(pos, arrows, heat, cells)
+                rects.append(rect)
+            if player_cells <= dirty:
+                cells.append(self.sprite("player", player_rect))
+            self.screen.blits(cells, doreturn=False)
+            if hud_state != self.drawn_hud:
+                self.draw_hud()
+                rects.append(HUD_RECT)
+            self.telemetry.mark("draw")
+            if rects:
+                pygame.display.update(rects)
+            self.telemetry.mark("flip")
+        self.drawn_selected = e.selected_solver
+        self.drawn_fire_tick = e.fire_tick
+        self.drawn_fires = e.grid.mask(FIRE)
+        self.drawn_player = player_rect
+        self.drawn_player_cells = player_cells
+        self.drawn_arrows = arrows
+        self.drawn_heat = heat
+        self.drawn_hud = hud_state
+
+    def draw_end_game_comparison(self, complete=True):
+        e = self.engine
+        dim = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
+        dim.fill((0, 0, 0, 150))
+        self.screen.blit(dim, (0, 0))
+        overlay_rect = pygame.Rect(40, 60, WINDOW_WIDTH - 80, WINDOW_HEIGHT - 160)
+        pygame.draw.rect(self.screen, (250, 250, 250), overlay_rect, border_radius=10)
+        pygame.draw.rect(self.screen, (40, 40, 40), overlay_rect, 2, border_radius=10)
+        self.screen.blit(self.result_title, (overlay_rect.x + 20, overlay_rect.y + 12))
+        lh = 30
+        top_y = overlay_rect.y + 70
+        start_x = overlay_rect.x + 30
+        text = [(self.small_labels[label], (start_x + dx, top_y)) for label, dx in RESULT_COLUMNS]
+        algos = ALGORITHMS
+        for i, algo in enumerate(algos):
+            y = top_y + (i + 1) * lh
+            if algo in e.stats:
+                s = e.stats[algo]
+                per_replan = s["replan_nodes"] // s["replans"] if s["replans"] else "-"
+                cells = [algo, f"{s['time'] * 1000:.2f}ms", s["nodes_expanded"], s["path_length"], s["replans"],
+                         per_replan, "Success" if s["success"] else "No Path"]
+                if s["derived"]:
+                    cells[1] = cells[2] = "–"
+            else:
+                cells = [algo, "Not run" if complete else "computing…", "", "", "", "", ""]
+            session = e.success_rate(algo)
+            if session:
+                cells += [f"{session[0]:.0%}", f"{session[1]:.2f}"]
+            for (_, dx), value in zip(RESULT_COLUMNS, cells):
+                if value == "":
+                    continue
+                label = self.small_labels.get(value) if isinstance(value, str) else None
+                text.append((label or self.small_font.render(str(value), True, BLACK), (start_x + dx, y)))
+        self.screen.blits(text, doreturn=False)
+        if any(s["derived"] for s in e.stats.values()):
+            self.screen.blit(self.derived_note, (start_x, top_y + (len(algos) + 1) * lh))
+        manual_y = top_y + (len(algos) + 2) * lh
+        mt1 = f"Manual Steps: {e.steps}"
+        mt2 = f"Manual Time: {e.elapsed()}s"
+        t1s = self.font.render(mt1, True, BLUE)
+        t2s = self.font.render(mt2, True, BLUE)
+        cx = overlay_rect.centerx
+        self.screen.blit(t1s, (cx - t1s.get_width() // 2, manual_y))
+        self.screen.blit(t2s, (cx - t2s.get_width() // 2, manual_y + lh))
+        failed = False
+        fail_msg = ""
+        if e.grid.get(e.player_pos) == FIRE:
+            failed = True
+            fail_msg = "You failed (stepped into fire)"
+        else:
+            alg_results = [e.stats.get(a, {}).get("success", None) for a in algos]
+            if all(r is not None for r in alg_results) and not any(alg_results) and e.player_pos != e.goal_pos:
+                failed = True
+                fail_msg = "You failed (no solution found by algorithms)"
+        if failed:
+            fm = self.big_font.render(fail_msg, True, (200, 30, 30))
+            self.screen.blit(fm, (overlay_rect.centerx - fm.get_width()//2, manual_y + 2*lh + 8))
+        btn_w, btn_h = 140, 44
+        bx = overlay_rect.centerx - btn_w - 12
+        by = overlay_rect.bottom - 70
+        rbtn = pygame.Rect(bx, by, btn_w, btn_h)
+        mbtn = pygame.Rect(overlay_rect.centerx + 12, by, btn_w, btn_h)
+        pygame.draw.rect(self.screen, BUTTON_BG, rbtn, border_radius=8)
+        pygame.draw.rect(self.screen, BUTTON_BORDER, rbtn, 2, border_radius=8)
+        pygame.draw.rect(self.screen, BUTTON_BG, mbtn, border_radius=8)
+        pygame.draw.rect(self.screen, BUTTON_BORDER, mbtn, 2, border_radius=8)
+        self.screen.blit(self.labels["Restart"], (rbtn.x + 34, rbtn.y + 12))
+        self.screen.blit(self.labels["Menu"], (mbtn.x + 50, mbtn.y + 12))
+        return rbtn, mbtn
+
+    def show_static(self, mode, render):
+        if mode not in self.static_screens:
+            buttons = render()
+            self.static_screens[mode] = (self.screen.copy(), buttons)
+        surface, buttons = self.static_screens[mode]
+        if self.shown_mode != mode:
+            self.screen.blit(surface, (0, 0))
+            pygame.display.flip()
+            self.shown_mode = mode
+        return buttons
+
+    def render_menu(self):
+        self.screen.fill(WHITE)
+        title = self.big_font.render("Escape the Fire", True, BLACK)
+        self.screen.blit(title, (WINDOW_WIDTH//2 - title.get_width()//2, 80))
+        btn_w, btn_h = 220, 48
+        spacing = 18
+        start_y = 200
+        buttons = [("Start Game", WINDOW_WIDTH//2 - btn_w//2, start_y),
+                   ("Instructions", WINDOW_WIDTH//2 - btn_w//2, start_y + btn_h + spacing),
+                   ("Quit", WINDOW_WIDTH//2 - btn_w//2, start_y + 2*(btn_h + spacing))]
+        menu_buttons = {}
+        for label, bx, by in buttons:
+            rect = pygame.Rect(bx, by, btn_w, btn_h)
+            pygame.draw.rect(self.screen, BUTTON_BG, rect, border_radius=6)
+            pygame.draw.rect(self.screen, BUTTON_BORDER, rect, 2, border_radius=6)
+            txt = self.font.render(label, True, BLACK)
+            self.screen.blit(txt, (bx + 16, by + 12))
+            menu_buttons[label] = rect
+        return menu_buttons
+
+    def handle_menu(self):
+        menu_buttons = self.show_static("menu", self.render_menu)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit(); sys.exit()
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.shown_mode = None
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                pos = event.pos
+                if menu_buttons["Start Game"].collidepoint(pos):
+                    self.reset_map()
+                    self.mode = "playing"
+                elif menu_buttons["Instructions"].collidepoint(pos):
+                    self.mode = "instructions"
+                elif menu_buttons["Quit"].collidepoint(pos):
+                    pygame.quit(); sys.exit()
+
+    def render_instructions(self):
+        self.screen.fill(WHITE)
+        title = self.big_font.render("Instructions", True, BLACK)
+        self.screen.blit(title, (WINDOW_WIDTH//2 - title.get_width()//2, 40))
+        ins = [
+            "Use arrow keys to move.",
+            "Use the solver buttons (A*, BFS, JPS, D* Lite, ...) to auto-solve.",
+            "When you choose a solver or start moving manually, all algorithms will start computing",
+            "Fires spread every few seconds — avoid them.",
+            "Press H to show where the fire is likely to be a few spreads from now.",
+            "Press F to cycle the simulation speed: 1×, 10× or as fast as possible.",
+            "If you reach the goal you win. If you step into fire you fail.",
+            "Use Back to return to the main menu."
+        ]
+        for i, line in enumerate(ins):
+            t = self.font.render(line, True, BLACK)
+            self.screen.blit(t, (80, 120 + i*36))
+        bx, by = 40, WINDOW_HEIGHT - 80
+        back_rect = pygame.Rect(bx, by, 140, 48)
+        pygame.draw.rect(self.screen, BUTTON_BG, back_rect, border_radius=6)
+        pygame.draw.rect(self.screen, BUTTON_BORDER, back_rect, 2, border_radius=6)
+        if self.back_img:
+            self.screen.blit(self.back_img, (bx + 8, by + 6))
+            self.screen.blit(self.font.render("Back", True, BLACK), (bx + 52, by + 14))
+        else:
+            self.screen.blit(self.font.render("Back", True, BLACK), (bx + 16, by + 14))
+        return {"Back": back_rect}
+
+    def handle_instructions(self):
+        buttons = self.show_static("instructions", self.render_instructions)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit(); sys.exit()
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.shown_mode = None
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                if buttons["Back"].collidepoint(event.pos):
+                    self.mode = "menu"
+
+    def handle_playing(self):
+        e = self.engine
+        tel = self.telemetry
+        tel.start_frame()
+        if self.shown_mode != "playing":
+            self.background = None
+            self.shown_mode = "playing"
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit(); sys.exit()
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.background = None
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                mx, my = event.pos
+                for label, rect in self.buttons.items():
+                    if rect.collidepoint((mx, my)):
+                        if label in ALGORITHMS:
+                            e.start_solver(label)
+                        elif label == "Restart":
+                            self.reset_map()
+                            self.mode = "playing"
+                        elif label == "Menu":
+                            self.mode = "menu"
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_UP:
+                    e.move_player(0, -1)
+                elif event.key == pygame.K_DOWN:
+                    e.move_player(0, 1)
+                elif event.key == pygame.K_LEFT:
+                    e.move_player(-1, 0)
+                elif event.key == pygame.K_RIGHT:
+                    e.move_player(1, 0)
+                elif event.key == pygame.K_h:
+                    self.show_heatmap = not self.show_heatmap
+                    self.background = None
+                elif event.key == pygame.K_f:
+                    self.speed = SPEEDS[(SPEEDS.index(self.speed) + 1) % len(SPEEDS)]
+        tel.mark("events")
+
+        finished = self.fast_forward() if self.speed is None else e.update(self.frame_dt, self.speed)
+        if finished:
+            self.mode = "result"
+            self.result_base = None
+
+        if self.mode == "playing":
+            self.render_playing()
+        tel.end_frame(sim_time=round(e.now, 3), dt_ms=round(self.frame_dt * 1000, 2))
+
+    def fast_forward(self):
+        # Tick flat out for a fixed wall-clock budget, then let one frame be
+        # drawn.
+        e = self.engine
+        deadline = time.perf_counter() + FAST_FORWARD_BUDGET
+        while time.perf_counter() < deadline:
+            if e.step_waiting():
+                return True
+        return False
+
+    def handle_result(self):
+        # One frame at a time like every other screen. The finished grid is
+        # drawn once; the comparison overlay is redrawn over it whenever
+        # more of the missing stats have come in.
+        e = self.engine
+        if self.result_base is None:
+            e.start_missing_stats()
+            self.screen.fill(WHITE)
+            self.draw_ui_top()
+            self.draw_grid()
+            self.result_base = self.screen.copy()
+            self.shown_mode = None
+        complete = e.poll_missing_stats()
+        result_state = (len(e.stats), len(e.pending_results), len(e.stats_queue))
+        if self.shown_mode != "result" or result_state != self.drawn_result:
+            self.screen.blit(self.result_base, (0, 0))
+            self.result_buttons = self.draw_end_game_comparison(complete)
+            pygame.display.flip()
+            self.shown_mode = "result"
+            self.drawn_result = result_state
+        rbtn, mbtn = self.result_buttons
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit(); sys.exit()
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.shown_mode = None
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                if rbtn.collidepoint(event.pos):
+                    self.reset_map()
+                    self.mode = "playing"
+                elif mbtn.collidepoint(event.pos):
+                    self.mode = "menu"
+
+    def run(self):
+        while True:
+            if self.assets is not None:
+                self.poll_assets()
+            if self.mode == "menu":
+                self.handle_menu()
+            elif self.mode == "instructions":
+                self.handle_instructions()
+            elif self.mode == "playing":
+                self.handle_playing()
+            elif self.mode == "result":
+                self.handle_result()
+            else:
+                self.mode = "menu"
+            self.frame_dt = self.clock.tick(FPS) / 1000.0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Escape the Fire")
+    parser.add_argument("--solver-pool", choices=["thread", "process", "none"], default="thread",
+                        help="where start_movement runs the solvers (default: thread)")
+    parser.add_argument("--record", metavar="DIR", default=None,
+                        help="save a replay of every episode to DIR (play back with replay.py)")
+    parser.add_argument("--telemetry", metavar="SINK", default=None,
+                        help="stream per-frame phase timings as NDJSON to a file, '-' or tcp://host:port")
+    parser.add_argument("--profile-frames", metavar="START:END", default=None,
+                        help="with --telemetry, run cProfile over this window of playing frames")
+    parser.add_argument("--profile-out", default="telemetry.prof", help="where --profile-frames writes its stats")
+    args = parser.parse_args()
+    telemetry = NO_TELEMETRY
+    if args.telemetry:
+        window = tuple(int(f) for f in args.profile_frames.split(":")) if args.profile_frames else None
+        telemetry = Telemetry(args.telemetry, frame_budget=1 / FPS, profile_frames=window,
+                              profile_out=args.profile_out)
+    game = EscapeTheFire(solver_pool=args.solver_pool, replay_dir=args.record, telemetry=telemetry)
+    try:
+        game.run()
+    finally:
+        telemetry.close()
@@ -0,0 +1,97 @@
+import math
+import time
+import heapq
+from collections import deque
+
+from grid import DIRECTIONS, WALL, FIRE
+from solvers import manhattan, a_star_with_parent
+
+INF = float("inf")
+
+# Spread ticks we assume the fire needs to cross one cell. The per-edge
+# delay is geometric in FIRE_SPREAD_PROB; planning against a low quantile
+# keeps the estimate pessimistic without treating every neighbour of a fire
+# as already lost.
+ARRIVAL_QUANTILE = 0.25
+
+
+def ticks_per_hop(prob, quantile=ARRIVAL_QUANTILE):
+    if prob >= 1.0:
+        return 1
+    return max(1, math.ceil(math.log(1.0 - quantile) / math.log(1.0 - prob)))
+
+
+def fire_arrival_times(grid, interval, prob, time_to_next_spread, exempt=()):
+    # Multi-source BFS from every burning cell through non-wall cells, turned
+    # into an estimated ignition time (seconds from now) per flat cell index.
+    # Walls and burning cells get 0, i.e. they are never usable.
+    w, h, buf = grid.width, grid.height, grid.buf
+    hops = [-1] * (w * h)
+    queue = deque()
+    for x, y in grid.positions(FIRE):
+        i = y * w + x
+        hops[i] = 0
+        queue.append(i)
+    while queue:
+        i = queue.popleft()
+        x, y = i % w, i // w
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < w and 0 <= ny < h:
+                j = ny * w + nx
+                if hops[j] < 0 and buf[j] != WALL:
+                    hops[j] = hops[i] + 1
+                    queue.append(j)
+    per_hop = ticks_per_hop(prob)
+    arrival = [0.0 if d == 0 or cell == WALL else INF if d < 0
+               else time_to_next_spread + (d * per_hop - 1) * interval
+               for d, cell in zip(hops, buf)]
+    for x, y in exempt:
+        arrival[y * w + x] = INF
+    return arrival
+
+
+def fire_aware_with_parent(grid, start, goal, arrival, move_delay, parents=True):
+    # Search over (cell, time). Reaching a cell earlier never hurts because
+    # the player may wait on a cell until the fire gets there, so only the
+    # earliest arrival per cell needs to be kept and the time-expanded graph
+    # collapses to A* with g measured in moves.
+    t0 = time.perf_counter()
+    w, h = grid.width, grid.height
+    open_set = [(manhattan(start, goal), 0, start)]
+    g_score = {start: 0}
+    parent = {} if parents else None
+    nodes = 0
+    while open_set:
+        nodes += 1
+        _, g, cur = heapq.heappop(open_set)
+        if g > g_score[cur]:
+            continue
+        if cur == goal:
+            return nodes, True, g, parent, time.perf_counter() - t0
+        x, y = cur
+        ng = g + 1
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < w and 0 <= ny < h):
+                continue
+            if ng * move_delay >= arrival[ny * w + nx]:
+                continue
+            nb = (nx, ny)
+            if ng < g_score.get(nb, INF):
+                g_score[nb] = ng
+                if parents:
+                    parent[nb] = cur
+                heapq.heappush(open_set, (ng + manhattan(nb, goal), ng, nb))
+    return nodes, False, 0, parent, time.perf_counter() - t0
+
+
+def fire_aware_with_fallback(grid, start, goal, arrival, move_delay, parents=True):
+    t0 = time.perf_counter()
+    n, succ, pl, parent, _ = fire_aware_with_parent(grid, start, goal, arrival, move_delay, parents)
+    if not succ:
+        # No route stays ahead of the predicted fire; fall back to the best
+        # route through the cells that are not burning yet.
+        fn, succ, pl, parent, _ = a_star_with_parent(grid, start, goal, parents)
+        n += fn
+    return n, succ, pl, parent, time.perf_counter() - t0
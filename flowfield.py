@@ -0,0 +1,110 @@
+import time
+import heapq
+from collections import deque
+
+from grid import neighbours
+
+INF = 1 << 30
+# Past this share of the grid losing its distance, a fresh BFS is cheaper
+# than settling the orphans one heap entry at a time.
+REBUILD_FRACTION = 0.1
+
+
+class FlowField:
+    # Goal-rooted BFS distances over free cells, one entry per flat index.
+    # The goal never moves during an episode, so the path length from any
+    # cell is a lookup and the next step is the neighbour one closer. Fire
+    # only ever removes cells, so notify() repairs just the cells whose
+    # shortest paths ran through the newly burning ones.
+    def __init__(self, grid, goal):
+        self.grid = grid
+        self.goal = goal
+        self.touched = 0
+        self.build()
+
+    def build(self):
+        w, h, buf = self.grid.width, self.grid.height, self.grid.buf
+        n = w * h
+        last = w - 1
+        dist = [INF] * n
+        g = self.goal[1] * w + self.goal[0]
+        dist[g] = 0
+        queue = deque([g])
+        while queue:
+            i = queue.popleft()
+            d = dist[i] + 1
+            x = i % w
+            for j in (i + 1 if x < last else -1, i - 1 if x else -1, i + w, i - w):
+                if 0 <= j < n and dist[j] == INF and not buf[j]:
+                    dist[j] = d
+                    queue.append(j)
+        self.dist = dist
+        self.touched += w * h
+
+    def notify(self, cells):
+        w, buf, dist = self.grid.width, self.grid.buf, self.dist
+        n = len(dist)
+        goal = self.goal[1] * w + self.goal[0]
+        # Invalidate, nearest the goal first: a cell keeps its distance d if
+        # some neighbour still sits at d - 1, otherwise it loses it and its
+        # children at d + 1 become suspect in turn.
+        suspects = []
+        for x, y in cells:
+            i = y * w + x
+            d = dist[i]
+            if d == INF:
+                continue
+            dist[i] = INF
+            self.touched += 1
+            for j in neighbours(i, w, n):
+                if dist[j] == d + 1:
+                    heapq.heappush(suspects, (d + 1, j))
+        orphans = []
+        while suspects:
+            d, i = heapq.heappop(suspects)
+            if dist[i] != d or i == goal:
+                continue
+            if any(dist[j] == d - 1 for j in neighbours(i, w, n)):
+                continue
+            dist[i] = INF
+            orphans.append(i)
+            for j in neighbours(i, w, n):
+                if dist[j] == d + 1:
+                    heapq.heappush(suspects, (d + 1, j))
+        if len(orphans) > REBUILD_FRACTION * len(dist):
+            self.build()
+            return
+        # Re-settle the orphans from whatever valid cells border them.
+        frontier = []
+        for i in orphans:
+            best = min(dist[j] for j in neighbours(i, w, n))
+            if best < INF:
+                heapq.heappush(frontier, (best + 1, i))
+        while frontier:
+            d, i = heapq.heappop(frontier)
+            if d >= dist[i]:
+                continue
+            dist[i] = d
+            for j in neighbours(i, w, n):
+                if not buf[j] and dist[j] > d + 1:
+                    heapq.heappush(frontier, (d + 1, j))
+        self.touched += len(orphans)
+
+    def distance(self, pos):
+        return self.dist[pos[1] * self.grid.width + pos[0]]
+
+    def plan(self, start, parents=True):
+        t0 = time.perf_counter()
+        w, dist = self.grid.width, self.dist
+        nodes, self.touched = self.touched, 0
+        cur = start[1] * w + start[0]
+        if dist[cur] == INF:
+            return nodes, False, 0, {}, time.perf_counter() - t0
+        if not parents:
+            return nodes, True, dist[cur], None, time.perf_counter() - t0
+        parent = {}
+        while dist[cur]:
+            nxt = next(j for j in neighbours(cur, w, len(dist)) if dist[j] == dist[cur] - 1)
+            parent[(nxt % w, nxt // w)] = (cur % w, cur // w)
+            cur = nxt
+        return nodes, True, dist[start[1] * w + start[0]], parent, time.perf_counter() - t0
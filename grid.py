@@ -0,0 +1,123 @@
+import numpy as np
+
+EMPTY = 0
+WALL = 1
+FIRE = 2
+
+DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+
+def neighbours(i, width, size):
+    # In-bounds neighbours of flat index i, in DIRECTIONS order. Worked out
+    # from the index rather than looked up in a per-cell table, which would
+    # cost far more than the grid's one byte per cell; the search loops
+    # inline the same tuple, with -1 for a step off the left or right edge
+    # and an index outside [0, size) for one off the top or bottom.
+    x = i % width
+    return [j for j in (i + 1 if x + 1 < width else -1, i - 1 if x else -1, i + width, i - width)
+            if 0 <= j < size]
+
+
+class Grid:
+    # One byte per cell. `buf` is the canonical store and is what the pure
+    # Python searches index into; `cells` is a (height, width) NumPy view of
+    # the same memory for whole-grid operations, so the two never diverge.
+    def __init__(self, width, height=None, data=None):
+        self.width = width
+        self.height = width if height is None else height
+        self.buf = bytearray(data) if data is not None else bytearray(self.width * self.height)
+        self.cells = np.frombuffer(self.buf, dtype=np.uint8).reshape(self.height, self.width)
+
+    def __getstate__(self):
+        return {"width": self.width, "height": self.height, "data": bytes(self.buf)}
+
+    def __setstate__(self, state):
+        self.__init__(state["width"], state["height"], state["data"])
+
+    def copy(self):
+        return Grid(self.width, self.height, self.buf)
+
+    def in_bounds(self, pos):
+        x, y = pos
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def index(self, pos):
+        return pos[1] * self.width + pos[0]
+
+    def position(self, index):
+        return (index % self.width, index // self.width)
+
+    def get(self, pos):
+        return self.buf[pos[1] * self.width + pos[0]]
+
+    def set(self, pos, state):
+        self.buf[pos[1] * self.width + pos[0]] = state
+
+    def is_free(self, pos):
+        x, y = pos
+        return 0 <= x < self.width and 0 <= y < self.height and not self.buf[y * self.width + x]
+
+    def clear(self, state=None):
+        if state is None:
+            self.cells[:] = EMPTY
+        else:
+            self.cells[self.cells == state] = EMPTY
+
+    def mask(self, state):
+        return self.cells == state
+
+    def positions(self, state):
+        ys, xs = np.nonzero(self.cells == state)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def count(self, state):
+        return int(np.count_nonzero(self.cells == state))
+
+    def get_neighbors(self, pos):
+        x, y = pos
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.width and 0 <= ny < self.height:
+                yield (nx, ny)
+
+
+class CellSetView:
+    # Set-like view of the cells holding one state, for code that still
+    # thinks of walls and fires as sets of (x, y) tuples.
+    def __init__(self, grid, state):
+        self.grid = grid
+        self.state = state
+
+    def __contains__(self, pos):
+        return self.grid.in_bounds(pos) and self.grid.get(pos) == self.state
+
+    def __iter__(self):
+        return iter(self.grid.positions(self.state))
+
+    def __len__(self):
+        return self.grid.count(self.state)
+
+    def __eq__(self, other):
+        return set(self) == set(other)
+
+    def add(self, pos):
+        self.grid.set(pos, self.state)
+
+    def discard(self, pos):
+        if pos in self:
+            self.grid.set(pos, EMPTY)
+
+    def remove(self, pos):
+        if pos not in self:
+            raise KeyError(pos)
+        self.grid.set(pos, EMPTY)
+
+    def clear(self):
+        self.grid.clear(self.state)
+
+    def update(self, positions):
+        for pos in positions:
+            self.grid.set(pos, self.state)
+
+    def copy(self):
+        return set(self)
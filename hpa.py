@@ -0,0 +1,266 @@
+import time
+import heapq
+
+import numpy as np
+
+from grid import Grid, EMPTY
+from solvers import manhattan, a_star_with_parent
+
+# A free run along a chunk border gets one portal in its middle, or one at
+# each end once it is longer than this.
+SHORT_RUN = 6
+# The portal search inflates the heuristic a little: on a building-sized map
+# it visits a third of the chunks for paths a few percent longer.
+HEURISTIC_WEIGHT = 1.2
+
+
+def free_rows(block):
+    # One uint64 per row of a chunk (at most 64 wide), bit x set where the
+    # cell is free.
+    free = np.zeros((block.shape[0], 64), dtype=bool)
+    free[:, :block.shape[1]] = block == EMPTY
+    return np.packbits(free, axis=1, bitorder="little").view(np.uint64)[:, 0]
+
+
+def local_distances(jobs):
+    # BFS distances inside chunks. Each job is (block, sources, targets) in
+    # local (x, y) cells and gets back a len(sources) x len(targets) list of
+    # lists, -1 where unreachable. Every source of every job advances in one
+    # wavefront over bit-packed rows, so the per-step NumPy overhead is paid
+    # once for a whole batch of chunks rather than once per chunk.
+    allowed, frontier, pairs, shapes = [], [], [], []
+    for block, sources, targets in jobs:
+        rows = free_rows(block)
+        for x, y in sources:
+            start = np.zeros(len(rows), dtype=np.uint64)
+            start[y] = np.uint64(1) << np.uint64(x)
+            pairs.extend((len(frontier), ty, tx) for tx, ty in targets)
+            allowed.append(rows)
+            frontier.append(start)
+        shapes.append((len(sources), len(targets)))
+    dist = np.full(len(pairs), -1, dtype=np.int32)
+    if pairs:
+        allowed = np.array(allowed)
+        frontier = np.array(frontier)
+        reached = frontier.copy()
+        pr, py, px = (np.array(column) for column in zip(*pairs))
+        px = px.astype(np.uint64)
+        one = np.uint64(1)
+        d = 0
+        while True:
+            hit = ((frontier[pr, py] >> px) & one).astype(bool) & (dist < 0)
+            dist[hit] = d
+            if (dist >= 0).all():
+                break
+            nxt = (frontier << one) | (frontier >> one)
+            nxt[:, 1:] |= frontier[:, :-1]
+            nxt[:, :-1] |= frontier[:, 1:]
+            nxt &= allowed
+            nxt &= ~reached
+            if not nxt.any():
+                break
+            reached |= nxt
+            frontier = nxt
+            d += 1
+    out = []
+    at = 0
+    for n, m in shapes:
+        out.append(dist[at:at + n * m].reshape(n, m).tolist())
+        at += n * m
+    return out
+
+
+class HierarchicalPlanner:
+    # HPA* over a ChunkedGrid. Portals are pairs of facing free cells on a
+    # chunk border; a search first runs over portals, using the distances
+    # between the portals of each chunk, then each hop is refined with an A*
+    # confined to one chunk. Borders and per-chunk distance tables are built
+    # the first time a search touches them and kept until notify() says
+    # cells in or next to that chunk changed.
+    def __init__(self, grid):
+        self.grid = grid
+        self.borders = {}
+        self.nodes = {}
+        self.edges = {}
+        self.stale = set()
+
+    def notify(self, cells):
+        # A changed cell invalidates its chunk's distance table; the border
+        # portals, and with them the neighbour's table, only when it lies on
+        # that border.
+        c = self.grid.chunk
+        stale = set()
+        for x, y in cells:
+            cx, cy = x // c, y // c
+            stale.add((cx, cy))
+            lx, ly = x - cx * c, y - cy * c
+            if lx == 0:
+                stale.add((cx - 1, cy))
+                self.borders.pop((cx - 1, cy, 0), None)
+            if lx == c - 1:
+                stale.add((cx + 1, cy))
+                self.borders.pop((cx, cy, 0), None)
+            if ly == 0:
+                stale.add((cx, cy - 1))
+                self.borders.pop((cx, cy - 1, 1), None)
+            if ly == c - 1:
+                stale.add((cx, cy + 1))
+                self.borders.pop((cx, cy, 1), None)
+        for key in stale:
+            self.nodes.pop(key, None)
+            if self.edges.pop(key, None) is not None:
+                self.stale.add(key)
+
+    def border(self, cx, cy, axis):
+        # Portal pairs between chunk (cx, cy) and its right (axis 0) or
+        # lower (axis 1) neighbour, as (this side, other side) cells.
+        key = (cx, cy, axis)
+        if key in self.borders:
+            return self.borders[key]
+        g = self.grid
+        c = g.chunk
+        ox, oy = (cx + 1, cy) if axis == 0 else (cx, cy + 1)
+        pairs = []
+        if ox < g.cols and oy < g.rows and g.uniform(cx, cy) in (EMPTY, None) and g.uniform(ox, oy) in (EMPTY, None):
+            if axis == 0:
+                free = (g.block(cx, cy)[:, c - 1] == EMPTY) & (g.block(ox, oy)[:, 0] == EMPTY)
+            else:
+                free = (g.block(cx, cy)[c - 1, :] == EMPTY) & (g.block(ox, oy)[0, :] == EMPTY)
+            edges = np.diff(np.concatenate(([0], free.view(np.int8), [0])))
+            for s, e in zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()):
+                offsets = [(s + e - 1) // 2] if e - s < SHORT_RUN else [s, e - 1]
+                for k in offsets:
+                    if axis == 0:
+                        pairs.append(((cx * c + c - 1, cy * c + k), (ox * c, cy * c + k)))
+                    else:
+                        pairs.append(((cx * c + k, cy * c + c - 1), (cx * c + k, oy * c)))
+        self.borders[key] = pairs
+        return pairs
+
+    def chunk_nodes(self, cx, cy):
+        # {portal cell in this chunk: [cells across the border it links to]}
+        key = (cx, cy)
+        if key in self.nodes:
+            return self.nodes[key]
+        links = {}
+        for here, there in self.border(cx, cy, 0) + self.border(cx, cy, 1):
+            links.setdefault(here, []).append(there)
+        for there, here in self.border(cx - 1, cy, 0) + self.border(cx, cy - 1, 1):
+            links.setdefault(here, []).append(there)
+        self.nodes[key] = links
+        return links
+
+    def job(self, cx, cy, sources, targets):
+        c = self.grid.chunk
+        x0, y0 = cx * c, cy * c
+        local = lambda cells: [(x - x0, y - y0) for x, y in cells]
+        return self.grid.block(cx, cy), local(sources), local(targets)
+
+    def distances(self, cx, cy, sources, targets):
+        if self.grid.uniform(cx, cy) == EMPTY:
+            return [[manhattan(s, t) for t in targets] for s in sources]
+        return local_distances([self.job(cx, cy, sources, targets)])[0]
+
+    def chunk_edges(self, cx, cy):
+        # {portal: [(portal, cost), ...]} between the portals of one chunk.
+        # Tables notify() dropped are rebuilt in the same batch, since a
+        # replan after a spread usually needs most of them again.
+        if (cx, cy) not in self.edges:
+            self.build_edges(self.stale | {(cx, cy)})
+            self.stale.clear()
+        return self.edges[(cx, cy)]
+
+    def build_edges(self, chunks):
+        jobs, pending = [], []
+        for key in chunks:
+            portals = list(self.chunk_nodes(*key))
+            if self.grid.uniform(*key) == EMPTY:
+                self.edges[key] = self.portal_edges(portals, self.distances(*key, portals, portals))
+            else:
+                jobs.append(self.job(*key, portals, portals))
+                pending.append((key, portals))
+        for (key, portals), table in zip(pending, local_distances(jobs)):
+            self.edges[key] = self.portal_edges(portals, table)
+
+    def portal_edges(self, portals, table):
+        return {p: [(q, d) for q, d in zip(portals, row) if d > 0] for p, row in zip(portals, table)}
+
+    def abstract_path(self, start, goal):
+        # Returns (nodes, success, length, hops, time); hops runs from start
+        # to goal through the portals crossed, and consecutive hops are
+        # either in one chunk or facing each other across a border.
+        t0 = time.perf_counter()
+        g = self.grid
+        if not (g.is_free(start) and g.is_free(goal)):
+            return 0, False, 0, [], time.perf_counter() - t0
+        sc, gc = g.chunk_of(start), g.chunk_of(goal)
+        goal_portals = list(self.chunk_nodes(*gc))
+        goal_edges = dict(zip(goal_portals, self.distances(*gc, [goal], goal_portals)[0]))
+        start_portals = list(self.chunk_nodes(*sc)) + ([goal] if sc == gc else [])
+        start_edges = [(p, d) for p, d in zip(start_portals, self.distances(*sc, [start], start_portals)[0]) if d >= 0]
+        # The start gets its own key, since it may also be a portal cell.
+        # Ties on f go to the entry furthest along, or open floor with many
+        # equally short routes would be searched breadth first.
+        open_set = [(HEURISTIC_WEIGHT * manhattan(start, goal), 0, 0, None)]
+        cost = {None: 0}
+        came = {}
+        nodes = 0
+        while open_set:
+            _, _, d, node = heapq.heappop(open_set)
+            if d > cost[node]:
+                continue
+            nodes += 1
+            if node == goal:
+                hops = [goal]
+                while node in came:
+                    node = came[node]
+                    hops.append(start if node is None else node)
+                hops.reverse()
+                return nodes, True, d, hops, time.perf_counter() - t0
+            if node is None:
+                edges = start_edges
+            else:
+                chunk = g.chunk_of(node)
+                edges = self.chunk_edges(*chunk).get(node, []) + [(p, 1) for p in self.chunk_nodes(*chunk).get(node, [])]
+                if chunk == gc and goal_edges.get(node, -1) >= 0:
+                    edges = edges + [(goal, goal_edges[node])]
+            for nxt, step in edges:
+                nd = d + step
+                if nd < cost.get(nxt, nd + 1):
+                    cost[nxt] = nd
+                    came[nxt] = node
+                    heapq.heappush(open_set, (nd + HEURISTIC_WEIGHT * manhattan(nxt, goal), -nd, nd, nxt))
+        return nodes, False, 0, [], time.perf_counter() - t0
+
+    def refine_hop(self, a, b):
+        # Cells after a up to and including b.
+        g = self.grid
+        if g.chunk_of(a) != g.chunk_of(b):
+            return [b]
+        c = g.chunk
+        cx, cy = g.chunk_of(a)
+        x0, y0 = cx * c, cy * c
+        local = Grid(c, c, g.block(cx, cy).tobytes())
+        target = (b[0] - x0, b[1] - y0)
+        _, success, _, parent, _ = a_star_with_parent(local, (a[0] - x0, a[1] - y0), target)
+        if not success:
+            return []
+        cells = []
+        p = target
+        while p in parent:
+            cells.append((p[0] + x0, p[1] + y0))
+            p = parent[p]
+        cells.reverse()
+        return cells
+
+    def plan(self, start, goal):
+        # The full cell path; same (nodes, success, length, path, time)
+        # shape as the flat solvers, with the path as a list of cells.
+        t0 = time.perf_counter()
+        nodes, success, _, hops, _ = self.abstract_path(start, goal)
+        if not success:
+            return nodes, False, 0, [], time.perf_counter() - t0
+        path = [start]
+        for a, b in zip(hops, hops[1:]):
+            path.extend(self.refine_hop(a, b))
+        return nodes, True, len(path) - 1, path, time.perf_counter() - t0
@@ -0,0 +1,34 @@
+import numpy as np
+
+from grid import EMPTY, WALL, FIRE
+
+
+def random_corridor(rng, start, goal):
+    # A random monotone staircase from start to goal: shuffle the required
+    # horizontal and vertical unit steps and take their running sums.
+    (sx, sy), (gx, gy) = start, goal
+    steps_x, steps_y = abs(gx - sx), abs(gy - sy)
+    horizontal = np.zeros(steps_x + steps_y, dtype=bool)
+    horizontal[:steps_x] = True
+    rng.shuffle(horizontal)
+    xs = sx + np.concatenate(([0], np.cumsum(horizontal))) * (1 if gx >= sx else -1)
+    ys = sy + np.concatenate(([0], np.cumsum(~horizontal))) * (1 if gy >= sy else -1)
+    return xs, ys
+
+
+def generate_map(grid, rng, start, goal, obstacle_density, fire_count):
+    # Connected by construction: walls and fires are scattered at random but
+    # never on a corridor carved from start to goal, so no retry loop and no
+    # path check are needed. Linear in the number of cells.
+    cells = grid.cells
+    cells[:] = EMPTY
+    cells[rng.random(cells.shape) < obstacle_density] = WALL
+    xs, ys = random_corridor(rng, start, goal)
+    cells[ys, xs] = EMPTY
+    protected = np.zeros(cells.shape, dtype=bool)
+    protected[ys, xs] = True
+    if fire_count:
+        fx = rng.integers(0, grid.width, fire_count)
+        fy = rng.integers(0, grid.height, fire_count)
+        ok = (cells[fy, fx] == EMPTY) & ~protected[fy, fx]
+        cells[fy[ok], fx[ok]] = FIRE
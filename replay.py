@@ -0,0 +1,169 @@
+import sys
+import time
+import zlib
+import hashlib
+import struct
+import argparse
+import cProfile
+import pstats
+from concurrent.futures import Future
+
+
+# The format version is the header byte after the magic; replays written
+# before the magic lost its digit start with b"EFR1" and are read the same.
+MAGIC = b"EFRP"
+OLD_MAGIC = b"EFR1"
+VERSION = 2
+HEADER = struct.Struct("<4sBQQHfIHHHHI")
+EVENT = struct.Struct("<QBB")
+
+OP_MOVE = 1
+OP_SOLVER = 2
+OP_FIRE = 3
+OP_AUTO = 4
+OP_END = 5
+OP_INSTALL = 6
+
+MOVES = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+RESULTS = [None, "win", "fail"]
+
+
+def state_key(grid, player_pos, goal_pos):
+    # Digest of the final state a replay must reproduce.
+    h = hashlib.blake2b(digest_size=16)
+    h.update(b"%d,%d,%d,%d,%d,%d;" % (grid.width, grid.height, *player_pos, *goal_pos))
+    h.update(grid.buf)
+    return h.digest()
+
+
+class ReplayRecorder:
+    # Captures one episode: the seed and generated map up front, then every
+    # state-changing event with the simulation tick it was applied at. Wall
+    # clock frame timing is not recorded, so replays run at full speed.
+    def __init__(self, engine):
+        self.seed = engine.episode_seed
+        self.start = engine.episode_start
+        self.grid_size = engine.grid_size
+        self.obstacle_density = engine.obstacle_density
+        self.fire_count = engine.fire_count
+        self.player_pos = engine.player_pos
+        self.goal_pos = engine.goal_pos
+        self.initial_grid = zlib.compress(bytes(engine.grid.buf))
+        self.events = bytearray()
+        self.digest = None
+
+    def record(self, tick, op, arg=0):
+        self.events += EVENT.pack(tick, op, arg)
+
+    def finish(self, engine):
+        self.record(engine.tick, OP_END, RESULTS.index(engine.result))
+        self.digest = state_key(engine.grid, engine.player_pos, engine.goal_pos)
+
+    def to_bytes(self):
+        header = HEADER.pack(MAGIC, VERSION, self.seed, self.start, self.grid_size, self.obstacle_density, self.fire_count,
+                             *self.player_pos, *self.goal_pos, len(self.initial_grid))
+        return header + self.initial_grid + bytes(self.events) + (self.digest or b"")
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+
+class Replay:
+    def __init__(self, data):
+        (magic, version, self.seed, self.start, self.grid_size, self.obstacle_density, self.fire_count,
+         px, py, gx, gy, grid_len) = HEADER.unpack_from(data)
+        if magic not in (MAGIC, OLD_MAGIC):
+            raise ValueError("not an Escape the Fire replay")
+        if version != VERSION:
+            raise ValueError("replay format version %d, this build reads version %d" % (version, VERSION))
+        self.player_pos = (px, py)
+        self.goal_pos = (gx, gy)
+        offset = HEADER.size
+        self.initial_grid = zlib.decompress(data[offset:offset + grid_len])
+        offset += grid_len
+        self.events = []
+        self.digest = None
+        while offset + EVENT.size <= len(data):
+            event = EVENT.unpack_from(data, offset)
+            offset += EVENT.size
+            self.events.append(event)
+            if event[1] == OP_END:
+                self.digest = data[offset:offset + 16]
+                break
+
+
+class ImmediatePool:
+    # Stands in for the solver pool of a recorded game: work runs at
+    # submit time, and the result is only installed when the replay
+    # reaches the recorded point the live game picked it up.
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def load_replay(path):
+    with open(path, "rb") as f:
+        return Replay(f.read())
+
+
+def play(replay):
+    from engine import FireEngine, ALGORITHMS
+
+    pooled = any(op == OP_INSTALL for _, op, _ in replay.events)
+    engine = FireEngine(grid_size=replay.grid_size, obstacle_density=replay.obstacle_density,
+                        fire_count=replay.fire_count, pool=ImmediatePool() if pooled else None)
+    engine.tick = replay.start
+    engine.reset_map(seed=replay.seed)
+    map_matches = bytes(engine.grid.buf) == replay.initial_grid
+    if not map_matches:
+        engine.grid.buf[:] = replay.initial_grid
+    for tick, op, arg in replay.events:
+        engine.tick = tick
+        if op == OP_MOVE:
+            engine.move_player(*MOVES[arg])
+        elif op == OP_SOLVER:
+            engine.start_solver(ALGORITHMS[arg])
+        elif op == OP_FIRE:
+            engine.advance_fire()
+        elif op == OP_AUTO:
+            engine.auto_step()
+        elif op == OP_INSTALL and ALGORITHMS[arg] in engine.pending_results:
+            engine.collect_solver(ALGORITHMS[arg])
+        elif op == OP_END:
+            engine.check_finished()
+            expected = RESULTS[arg]
+            final_matches = (engine.result == expected and
+                             state_key(engine.grid, engine.player_pos, engine.goal_pos) == replay.digest)
+            return engine, map_matches and final_matches
+    return engine, map_matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-simulate recorded episodes without a display.")
+    parser.add_argument("replays", nargs="+")
+    parser.add_argument("--profile", action="store_true", help="print the hottest functions across all replays")
+    args = parser.parse_args()
+
+    profiler = cProfile.Profile() if args.profile else None
+    failures = 0
+    for path in args.replays:
+        replay = load_replay(path)
+        t0 = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        engine, ok = play(replay)
+        if profiler:
+            profiler.disable()
+        elapsed = time.perf_counter() - t0
+        failures += not ok
+        print(f"{path}: seed {replay.seed}, {len(replay.events)} events, result {engine.result or 'stuck'}, "
+              f"steps {engine.steps}, {elapsed * 1000:.1f} ms, {'ok' if ok else 'DIVERGED'}")
+    if profiler:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import copy
+import math
+import time
+import heapq
+
+import numpy as np
+
+from grid import EMPTY, FIRE
+from solvers import manhattan
+
+ROLLOUTS = 256
+# Spread ticks simulated ahead; long enough to cover a crossing of the
+# default 20x20 map at the auto-move speed.
+HORIZON = 12
+# Extra cost, in moves, per unit of -log(survival) of entering a cell.
+RISK_WEIGHT = 4.0
+MAX_RISK = 0.99
+# Rollouts are split into this many jobs whether or not a pool runs them,
+# so the estimate (and a replay of a Risk A* run) is the same either way.
+CHUNKS = 8
+
+
+def rollout_ignitions(cells, prob, steps, rollouts, seed, exempt=()):
+    # `rollouts` independent copies of spread_fire run side by side as one
+    # (rollouts, h, w) array. Returns, per spread step, how many rollouts
+    # ignited each cell at that step.
+    rng = np.random.default_rng(seed)
+    free = cells == EMPTY
+    for x, y in exempt:
+        free[y, x] = False
+    fire = np.broadcast_to(cells == FIRE, (rollouts,) + cells.shape).copy()
+    ignite_prob = 1.0 - (1.0 - prob) ** np.arange(5)
+    ignitions = np.zeros((steps,) + cells.shape, dtype=np.int32)
+    counts = np.zeros(fire.shape, dtype=np.uint8)
+    for k in range(steps):
+        counts[:] = 0
+        counts[:, 1:, :] += fire[:, :-1, :]
+        counts[:, :-1, :] += fire[:, 1:, :]
+        counts[:, :, 1:] += fire[:, :, :-1]
+        counts[:, :, :-1] += fire[:, :, 1:]
+        hit = free & ~fire & (rng.random(fire.shape) < ignite_prob[counts])
+        fire |= hit
+        ignitions[k] = hit.sum(axis=0)
+    return ignitions
+
+
+class RiskMap:
+    # Monte Carlo estimate of P(cell burning) after each of the next HORIZON
+    # spread ticks. burn[k][i] is that probability for flat cell i after k
+    # more ticks; burn[0] is the fire as it is now.
+    def __init__(self, cells, ignitions, rollouts, interval):
+        now = (cells == FIRE).astype(np.float64)
+        by_step = np.cumsum(ignitions, axis=0) / rollouts + now
+        self.steps = np.concatenate((now[None], by_step)).reshape(len(ignitions) + 1, -1)
+        self.burn = self.steps.tolist()
+        self.interval = interval
+        self.elapsed = 0.0
+
+    def after(self, elapsed):
+        # The same estimate, seen `elapsed` seconds after the spread it was
+        # taken at; shares the arrays.
+        view = copy.copy(self)
+        view.elapsed = elapsed
+        return view
+
+    def step_at(self, t):
+        # Spread ticks that will have happened t seconds from now.
+        return min(len(self.burn) - 1, int((self.elapsed + t) // self.interval))
+
+    def at_step(self, step):
+        return self.steps[min(step, len(self.burn) - 1)]
+
+
+def burn_risk(cells, prob, interval, seed, exempt=(), pool=None, chunks=CHUNKS,
+              rollouts=ROLLOUTS, steps=HORIZON):
+    # Chunk seeds are spawned from `seed`, so the estimate is reproducible;
+    # with a pool the chunks run as separate jobs.
+    sizes = [rollouts // chunks + (i < rollouts % chunks) for i in range(chunks)]
+    seeds = np.random.SeedSequence(seed).spawn(chunks)
+    if pool is None:
+        parts = [rollout_ignitions(cells, prob, steps, n, s, exempt) for n, s in zip(sizes, seeds)]
+    else:
+        futures = [pool.submit(rollout_ignitions, cells, prob, steps, n, s, exempt) for n, s in zip(sizes, seeds)]
+        parts = [f.result() for f in futures]
+    return RiskMap(cells, sum(parts), rollouts, interval)
+
+
+def risk_a_star_with_parent(grid, start, goal, risk, move_delay, weight=RISK_WEIGHT, parents=True):
+    # A* where entering a cell costs one move plus `weight` times its
+    # -log(1 - p), p being the chance it is burning by the time we get there
+    # along this route. Costs are at least 1 per move, so Manhattan distance
+    # stays admissible. Risk is capped below 1, so only cells burning now
+    # are impassable and a route is found whenever plain A* finds one.
+    t0 = time.perf_counter()
+    w, buf = grid.width, grid.buf
+    n = len(buf)
+    last = w - 1
+    gx, gy = goal
+    s, t = start[1] * w + start[0], gy * w + gx
+    open_set = [(manhattan(start, goal), 0.0, 0, s)]
+    cost = {s: 0.0}
+    parent = {} if parents else None
+    nodes = 0
+    while open_set:
+        nodes += 1
+        _, c, moves, i = heapq.heappop(open_set)
+        if c > cost[i]:
+            continue
+        if i == t:
+            return nodes, True, moves, parent, time.perf_counter() - t0
+        burn = risk.burn[risk.step_at((moves + 1) * move_delay)]
+        x = i % w
+        for j in (i + 1 if x < last else -1, i - 1 if x else -1, i + w, i - w):
+            if j < 0 or j >= n or buf[j]:
+                continue
+            p = min(burn[j], MAX_RISK)
+            nc = c + 1.0 - weight * math.log1p(-p)
+            if nc < cost.get(j, math.inf):
+                cost[j] = nc
+                if parents:
+                    parent[(j % w, j // w)] = (i % w, i // w)
+                heapq.heappush(open_set, (nc + abs(j % w - gx) + abs(j // w - gy), nc, moves + 1, j))
+    return nodes, False, 0, {} if parents else None, time.perf_counter() - t0
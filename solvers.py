@@ -0,0 +1,444 @@
+import time
+import heapq
+import threading
+from array import array
+from collections import deque
+
+import numpy as np
+
+from grid import DIRECTIONS, EMPTY
+
+_local = threading.local()
+
+
+def manhattan(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+def path_length(parent, goal):
+    length = 0
+    p = goal
+    while p in parent:
+        p = parent[p]
+        length += 1
+    return length
+
+
+class ParentMap:
+    # Read-only {cell: previous cell} view over a flat parent array, where
+    # links[i] is the index cell i was reached from or -1. Path walking code
+    # written against dicts keeps working, and the result a solver hands back,
+    # possibly across a worker pool, is one int32 per cell.
+    def __init__(self, width, links):
+        self.width = width
+        self.links = links
+
+    def __contains__(self, pos):
+        x, y = pos
+        i = y * self.width + x
+        return 0 <= x < self.width and 0 <= i < len(self.links) and self.links[i] >= 0
+
+    def __getitem__(self, pos):
+        j = int(self.links[pos[1] * self.width + pos[0]])
+        if j < 0:
+            raise KeyError(pos)
+        return (j % self.width, j // self.width)
+
+    def get(self, pos, default=None):
+        return self[pos] if pos in self else default
+
+    def __len__(self):
+        return int(np.count_nonzero(self.links >= 0))
+
+
+class SearchBuffers:
+    # Per-cell scratch arrays reused by every search on one grid size. An
+    # entry of g or parent only counts when seen[i] holds the current
+    # generation, so starting a search is an increment instead of clearing
+    # w * h cells; closed works the same way.
+    def __init__(self, size):
+        self.seen = array("I", bytes(4 * size))
+        self.closed = array("I", bytes(4 * size))
+        self.g = array("i", bytes(4 * size))
+        self.parent = array("i", bytes(4 * size))
+        self.generation = 0
+
+    def next_generation(self):
+        self.generation += 1
+        if self.generation == 0xFFFFFFFF:
+            self.seen = array("I", bytes(4 * len(self.seen)))
+            self.closed = array("I", bytes(4 * len(self.closed)))
+            self.generation = 1
+        return self.generation
+
+    def links(self):
+        # Copy out the parents this generation set; stale entries become -1.
+        seen = np.frombuffer(self.seen, dtype=np.uint32)
+        parent = np.frombuffer(self.parent, dtype=np.int32)
+        return np.where(seen == self.generation, parent, -1).astype(np.int32)
+
+    def parent_map(self, width, invalid=-1):
+        # Solvers called with parents=False only want the stats (the length
+        # is g at the goal) and hand back None instead of paying for this copy.
+        links = self.links()
+        if invalid >= 0:
+            links[invalid] = -1
+        return ParentMap(width, links)
+
+
+def search_buffers(size, slot=0):
+    # Buffers are per thread, since the thread pool runs solvers side by
+    # side; slot 1 is the second side of a bidirectional search.
+    cached = getattr(_local, "buffers", None)
+    if cached is None or cached[0] != size:
+        cached = _local.buffers = (size, [SearchBuffers(size), SearchBuffers(size)])
+    return cached[1][slot]
+
+
+def start_search(buffers, s):
+    gen = buffers.next_generation()
+    buffers.seen[s] = gen
+    buffers.g[s] = 0
+    buffers.parent[s] = -1
+    return gen
+
+
+def bfs_check_path_exists(grid, start, goal):
+    w, buf = grid.width, grid.buf
+    n = len(buf)
+    last = w - 1
+    b = search_buffers(n)
+    s, t = start[1] * w + start[0], goal[1] * w + goal[0]
+    gen = start_search(b, s)
+    seen = b.seen
+    queue = deque([s])
+    while queue:
+        i = queue.popleft()
+        if i == t:
+            return True
+        x = i % w
+        for j in (i + 1 if x < last else -1, i - 1 if x else -1, i + w, i - w):
+            if 0 <= j < n and not buf[j] and seen[j] != gen:
+                seen[j] = gen
+                queue.append(j)
+    return False
+
+
+def bfs_search_with_parent(grid, start, goal, parents=True):
+    t0 = time.perf_counter()
+    w, buf = grid.width, grid.buf
+    n = len(buf)
+    last = w - 1
+    b = search_buffers(n)
+    s, t = start[1] * w + start[0], goal[1] * w + goal[0]
+    gen = start_search(b, s)
+    seen, g, parent = b.seen, b.g, b.parent
+    queue = deque([s])
+    nodes = 0
+    while queue:
+        nodes += 1
+        i = queue.popleft()
+        if i == t:
+            return nodes, True, g[t], b.parent_map(w) if parents else None, time.perf_counter() - t0
+        d = g[i] + 1
+        x = i % w
+        for j in (i + 1 if x < last else -1, i - 1 if x else -1, i + w, i - w):
+            if 0 <= j < n and not buf[j] and seen[j] != gen:
+                seen[j] = gen
+                g[j] = d
+                parent[j] = i
+                queue.append(j)
+    return nodes, False, 0, b.parent_map(w, t) if parents else None, time.perf_counter() - t0
+
+
+def greedy_with_parent(grid, start, goal, parents=True):
+    # Heap entries here and below are single ints, priority * cells + index,
+    # so a push allocates no tuple.
+    t0 = time.perf_counter()
+    w, buf = grid.width, grid.buf
+    n = len(buf)
+    last = w - 1
+    b = search_buffers(n)
+    gx, gy = goal
+    s, t = start[1] * w + start[0], gy * w + gx
+    gen = start_search(b, s)
+    seen, g, parent = b.seen, b.g, b.parent
+    pq = [manhattan(start, goal) * n + s]
+    nodes = 0
+    while pq:
+        nodes += 1
+        i = heapq.heappop(pq) % n
+        if i == t:
+            return nodes, True, g[t], b.parent_map(w) if parents else None, time.perf_counter() - t0
+        d = g[i] + 1
+        x = i % w
+        for j in (i + 1 if x < last else -1, i - 1 if x else -1, i + w, i - w):
+            if 0 <= j < n and not buf[j] and seen[j] != gen:
+                seen[j] = gen
+                g[j] = d
+                parent[j] = i
+                heapq.heappush(pq, (abs(j % w - gx) + abs(j // w - gy)) * n + j)
+    return nodes, False, 0, b.parent_map(w, t) if parents else None, time.perf_counter() - t0
+
+
+def a_star_with_parent(grid, start, goal, parents=True):
+    start_time = time.perf_counter()
+    w, buf = grid.width, grid.buf
+    n = len(buf)
+    last = w - 1
+    b = search_buffers(n)
+    gx, gy = goal
+    s, t = start[1] * w + start[0], gy * w + gx
+    gen = start_search(b, s)
+    seen, closed, g, parent = b.seen, b.closed, b.g, b.parent
+    open_set = [manhattan(start, goal) * n + s]
+    nodes = 0
+    while open_set:
+        nodes += 1
+        i = heapq.heappop(open_set) % n
+        if closed[i] == gen:
+            continue
+        if i == t:
+            return nodes, True, g[t], b.parent_map(w) if parents else None, time.perf_counter() - start_time
+        closed[i] = gen
+        tentative_g = g[i] + 1
+        x = i % w
+        for j in (i + 1 if x < last else -1, i - 1 if x else -1, i + w, i - w):
+            if j < 0 or j >= n or buf[j]:
+                continue
+            if seen[j] != gen or tentative_g < g[j]:
+                seen[j] = gen
+                g[j] = tentative_g
+                parent[j] = i
+                heapq.heappush(open_set, (tentative_g + abs(j % w - gx) + abs(j // w - gy)) * n + j)
+    return nodes, False, 0, b.parent_map(w, t) if parents else None, time.perf_counter() - start_time
+
+
+def join_bidirectional(forward, backward, meet, width):
+    # Splice the goal-side chain onto the start-side tree so the usual
+    # walk back from the goal reconstructs the whole path.
+    links = forward.links()
+    parent = backward.parent
+    cur = meet
+    while parent[cur] >= 0:
+        nxt = parent[cur]
+        links[nxt] = cur
+        cur = nxt
+    return ParentMap(width, links)
+
+
+def bidirectional_bfs_with_parent(grid, start, goal, parents=True):
+    t0 = time.perf_counter()
+    w, buf = grid.width, grid.buf
+    n = len(buf)
+    last = w - 1
+    s, t = start[1] * w + start[0], goal[1] * w + goal[0]
+    sides = [search_buffers(n, 0), search_buffers(n, 1)]
+    gens = [start_search(sides[0], s), start_search(sides[1], t)]
+    if s == t:
+        return 1, True, 0, sides[0].parent_map(w) if parents else None, time.perf_counter() - t0
+    frontiers = [[s], [t]]
+    nodes = 0
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        mine, other = sides[side], sides[1 - side]
+        gen, other_gen = gens[side], gens[1 - side]
+        seen, g, parent = mine.seen, mine.g, mine.parent
+        other_seen, other_g = other.seen, other.g
+        best, meet = None, None
+        next_frontier = []
+        for i in frontiers[side]:
+            nodes += 1
+            d = g[i] + 1
+            x = i % w
+            for j in (i + 1 if x < last else -1, i - 1 if x else -1, i + w, i - w):
+                if j < 0 or j >= n or buf[j] or seen[j] == gen:
+                    continue
+                seen[j] = gen
+                g[j] = d
+                parent[j] = i
+                next_frontier.append(j)
+                if other_seen[j] == other_gen and (best is None or d + other_g[j] < best):
+                    best, meet = d + other_g[j], j
+        frontiers[side] = next_frontier
+        if meet is not None:
+            parent = join_bidirectional(sides[0], sides[1], meet, w) if parents else None
+            return nodes, True, best, parent, time.perf_counter() - t0
+    return nodes, False, 0, sides[0].parent_map(w, t) if parents else None, time.perf_counter() - t0
+
+
+def bidirectional_a_star_with_parent(grid, start, goal, parents=True):
+    t0 = time.perf_counter()
+    w, buf = grid.width, grid.buf
+    n = len(buf)
+    last = w - 1
+    s, t = start[1] * w + start[0], goal[1] * w + goal[0]
+    targets = (goal, start)
+    sides = [search_buffers(n, 0), search_buffers(n, 1)]
+    gens = [start_search(sides[0], s), start_search(sides[1], t)]
+    opens = [[manhattan(start, goal) * n + s], [manhattan(goal, start) * n + t]]
+    best, meet = (0, s) if s == t else (float("inf"), None)
+    nodes = 0
+    while opens[0] and opens[1]:
+        # With a consistent heuristic no path through either open list can
+        # beat `best` once that list's smallest f reaches it.
+        if opens[0][0] // n >= best or opens[1][0] // n >= best:
+            break
+        side = 0 if len(opens[0]) <= len(opens[1]) else 1
+        mine, other = sides[side], sides[1 - side]
+        gen, other_gen = gens[side], gens[1 - side]
+        i = heapq.heappop(opens[side]) % n
+        if mine.closed[i] == gen:
+            continue
+        mine.closed[i] = gen
+        nodes += 1
+        seen, g, parent = mine.seen, mine.g, mine.parent
+        tx, ty = targets[side]
+        tentative_g = g[i] + 1
+        x = i % w
+        for j in (i + 1 if x < last else -1, i - 1 if x else -1, i + w, i - w):
+            if j < 0 or j >= n or buf[j]:
+                continue
+            if seen[j] != gen or tentative_g < g[j]:
+                seen[j] = gen
+                g[j] = tentative_g
+                parent[j] = i
+                heapq.heappush(opens[side], (tentative_g + abs(j % w - tx) + abs(j // w - ty)) * n + j)
+                if other.seen[j] == other_gen and tentative_g + other.g[j] < best:
+                    best, meet = tentative_g + other.g[j], j
+    if meet is None:
+        return nodes, False, 0, sides[0].parent_map(w, t) if parents else None, time.perf_counter() - t0
+    parent = join_bidirectional(sides[0], sides[1], meet, w) if parents else None
+    return nodes, True, best, parent, time.perf_counter() - t0
+
+
+def run_ends(stop, free, marks, axis, forward):
+    # Flat index of the first `stop` cell a straight run from each cell
+    # reaches, looking forward or back along `axis`, before a blocked cell
+    # cuts it off; -1 where there is none. Flat indices grow along both
+    # axes, so stops and walls share one running minimum (forward) or
+    # maximum (back) over `marks`, twice the flat index, with the low bit
+    # telling which of the two came first.
+    if forward:
+        flip = (slice(None, None, -1),) if axis == 0 else (slice(None), slice(None, None, -1))
+        first = np.minimum.accumulate(np.where(free & ~stop, 2 * stop.size + 1, marks + ~stop)[flip],
+                                      axis=axis)[flip]
+        return np.where(first & 1, -1, first >> 1)
+    last = np.maximum.accumulate(np.where(free & ~stop, -1, marks + stop), axis=axis)
+    return np.where(last & 1, last >> 1, -1)
+
+
+def jump_tables(grid, goal):
+    # Where a straight run entering each cell stops, per direction, as flat
+    # indices (-1 if it runs into a wall first). A horizontal run stops at
+    # the goal or a forced neighbour; a vertical one also where either
+    # horizontal run from beside it would stop. Working out every run up
+    # front in numpy keeps each jump to one lookup, where walking the runs
+    # cell by cell made vertical jumps rescan whole rows.
+    free = grid.cells == EMPTY
+    pad = np.pad(free, 1)
+    up, down = pad[:-2, 1:-1], pad[2:, 1:-1]
+    left, right = pad[1:-1, :-2], pad[1:-1, 2:]
+    up_left, up_right = pad[:-2, :-2], pad[:-2, 2:]
+    down_left, down_right = pad[2:, :-2], pad[2:, 2:]
+    at_goal = np.zeros_like(free)
+    at_goal[goal[1], goal[0]] = True
+    marks = np.arange(0, 2 * free.size, 2, dtype=np.int32).reshape(free.shape)
+    stop_right = free & (at_goal | (up & ~up_left) | (down & ~down_left))
+    stop_left = free & (at_goal | (up & ~up_right) | (down & ~down_right))
+    run_right = run_ends(stop_right, free, marks, 1, True)
+    run_left = run_ends(stop_left, free, marks, 1, False)
+    beside = np.zeros_like(free)
+    beside[:, :-1] |= run_right[:, 1:] >= 0
+    beside[:, 1:] |= run_left[:, :-1] >= 0
+    stop_down = free & (at_goal | beside | (left & ~up_left) | (right & ~up_right))
+    stop_up = free & (at_goal | beside | (left & ~down_left) | (right & ~down_right))
+    run_down = run_ends(stop_down, free, marks, 0, True)
+    run_up = run_ends(stop_up, free, marks, 0, False)
+    return {(1, 0): array("i", run_right.tobytes()), (-1, 0): array("i", run_left.tobytes()),
+            (0, 1): array("i", run_down.tobytes()), (0, -1): array("i", run_up.tobytes())}
+
+
+def cached_jump_tables(grid, goal):
+    # The tables only change when the map does, i.e. once per fire spread,
+    # so each thread keeps the last ones it built and the replans in
+    # between reuse them. The key is the map's bytes, not the grid object,
+    # since a pooled solver gets a fresh copy of the same map every time.
+    cached = getattr(_local, "jumps", None)
+    if cached is None or cached[0] != (grid.width, goal) or cached[1] != grid.buf:
+        cached = _local.jumps = ((grid.width, goal), bytes(grid.buf), jump_tables(grid, goal))
+    return cached[2]
+
+
+def jump_point_search_with_parent(grid, start, goal, parents=True):
+    # Jump point search restricted to four directions. Straight runs are
+    # skipped until a cell with a forced neighbour, the goal, or (for
+    # vertical runs) a cell whose horizontal scan finds one; only those
+    # jump points enter the open list, and only their expansions count as
+    # nodes; building the jump tables, once per map state, shows in the time.
+    t0 = time.perf_counter()
+    w, h, buf = grid.width, grid.height, grid.buf
+    n = len(buf)
+    gx, gy = goal
+    runs = cached_jump_tables(grid, goal)
+
+    b = search_buffers(n)
+    s, t = start[1] * w + start[0], gy * w + gx
+    gen = start_search(b, s)
+    seen, closed, g, jump_parent = b.seen, b.closed, b.g, b.parent
+    open_set = [manhattan(start, goal) * n + s]
+    nodes = 0
+    while open_set:
+        i = heapq.heappop(open_set) % n
+        if closed[i] == gen:
+            continue
+        nodes += 1
+        if i == t:
+            if not parents:
+                return nodes, True, g[t], None, time.perf_counter() - t0
+            # Fill in the straight runs between consecutive jump points.
+            links = np.full(n, -1, dtype=np.int32)
+            node = t
+            while jump_parent[node] >= 0:
+                prev = jump_parent[node]
+                step = 1 if prev // w == node // w else w
+                if prev < node:
+                    step = -step
+                while node != prev:
+                    links[node] = node + step
+                    node += step
+            return nodes, True, g[t], ParentMap(w, links), time.perf_counter() - t0
+        closed[i] = gen
+        x, y = i % w, i // w
+        if jump_parent[i] >= 0:
+            px, py = jump_parent[i] % w, jump_parent[i] // w
+            dx = (x > px) - (x < px)
+            dy = (y > py) - (y < py)
+            directions = [(0, -1), (0, 1), (dx, 0)] if dx else [(-1, 0), (1, 0), (0, dy)]
+        else:
+            directions = DIRECTIONS
+        for dx, dy in directions:
+            if not (0 <= x + dx < w and 0 <= y + dy < h):
+                continue
+            j = runs[dx, dy][i + dy * w + dx]
+            if j < 0:
+                continue
+            jx, jy = j % w, j // w
+            tentative_g = g[i] + abs(jx - x) + abs(jy - y)
+            if seen[j] != gen or tentative_g < g[j]:
+                seen[j] = gen
+                g[j] = tentative_g
+                jump_parent[j] = i
+                heapq.heappush(open_set, (tentative_g + abs(jx - gx) + abs(jy - gy)) * n + j)
+    parent = ParentMap(w, np.full(n, -1, dtype=np.int32)) if parents else None
+    return nodes, False, 0, parent, time.perf_counter() - t0
+
+
+SOLVERS = {
+    "A*": a_star_with_parent,
+    "Greedy": greedy_with_parent,
+    "BFS": bfs_search_with_parent,
+    "Bi-BFS": bidirectional_bfs_with_parent,
+    "Bi-A*": bidirectional_a_star_with_parent,
+    "JPS": jump_point_search_with_parent,
+}
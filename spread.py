@@ -0,0 +1,31 @@
+import numpy as np
+
+from grid import EMPTY, FIRE
+
+
+def burning_neighbour_counts(fire):
+    counts = np.zeros(fire.shape, dtype=np.uint8)
+    counts[1:, :] += fire[:-1, :]
+    counts[:-1, :] += fire[1:, :]
+    counts[:, 1:] += fire[:, :-1]
+    counts[:, :-1] += fire[:, 1:]
+    return counts
+
+
+def spread_fire(cells, rng, prob, exempt=()):
+    # Every burning cell tries each free neighbour independently with
+    # probability `prob`, so a cell with k burning neighbours ignites with
+    # 1 - (1 - prob) ** k. One uniform draw per candidate cell reproduces the
+    # per-edge distribution without looping over edges.
+    counts = burning_neighbour_counts(cells == FIRE)
+    candidates = (cells == EMPTY) & (counts > 0)
+    for x, y in exempt:
+        candidates[y, x] = False
+    ys, xs = np.nonzero(candidates)
+    if not len(ys):
+        return xs, ys
+    ignite_prob = 1.0 - (1.0 - prob) ** np.arange(5)
+    hit = rng.random(len(ys)) < ignite_prob[counts[ys, xs]]
+    ys, xs = ys[hit], xs[hit]
+    cells[ys, xs] = FIRE
+    return xs, ys
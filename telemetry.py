@@ -0,0 +1,137 @@
+import sys
+import json
+import time
+import queue
+import socket
+import cProfile
+import threading
+
+BUFFER_SIZE = 4096
+
+
+class NullTelemetry:
+    # Stand-in used when no sink is configured, so the hot paths can call
+    # the hooks unconditionally.
+    def start_frame(self):
+        pass
+
+    def mark(self, phase):
+        pass
+
+    def count(self, name, n=1):
+        pass
+
+    def end_frame(self, **fields):
+        pass
+
+    def emit(self, record):
+        pass
+
+    def close(self):
+        pass
+
+
+NO_TELEMETRY = NullTelemetry()
+
+
+def open_sink(spec):
+    # "-" is stdout, "tcp://host:port" a socket, anything else a file path.
+    if spec == "-":
+        return sys.stdout.write, sys.stdout.flush, lambda: None
+    if spec.startswith("tcp://"):
+        host, port = spec[len("tcp://"):].rsplit(":", 1)
+        sock = socket.create_connection((host, int(port)))
+        return lambda line: sock.sendall(line.encode()), lambda: None, sock.close
+    f = open(spec, "w")
+    return f.write, f.flush, f.close
+
+
+class Telemetry:
+    # Per-frame phase timings and counters, streamed as NDJSON. The game
+    # loop only appends to a bounded queue; a writer thread does the JSON
+    # encoding and I/O, and records are dropped (and counted) rather than
+    # ever blocking a frame when the sink falls behind.
+    def __init__(self, sink, frame_budget=None, profile_frames=None, profile_out="telemetry.prof",
+                 capacity=BUFFER_SIZE):
+        self.sink = sink
+        self.frame_budget = frame_budget
+        self.profile_frames = profile_frames
+        self.profile_out = profile_out
+        self.profiler = None
+        self.queue = queue.Queue(maxsize=capacity)
+        self.dropped = 0
+        self.frame = 0
+        self.frame_start = self.last_mark = time.perf_counter_ns()
+        self.phases = {}
+        self.counters = {}
+        self.writer = threading.Thread(target=self.write_loop, name="telemetry-writer", daemon=True)
+        self.writer.start()
+
+    def start_frame(self):
+        if self.profile_frames and self.frame == self.profile_frames[0]:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.frame_start = self.last_mark = time.perf_counter_ns()
+
+    def mark(self, phase):
+        # Charge the time since the previous mark to `phase`; a phase marked
+        # several times in one frame accumulates.
+        now = time.perf_counter_ns()
+        self.phases[phase] = self.phases.get(phase, 0) + now - self.last_mark
+        self.last_mark = now
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def end_frame(self, **fields):
+        total = time.perf_counter_ns() - self.frame_start
+        record = {"type": "frame", "frame": self.frame, "total_us": total // 1000,
+                  "phases_us": {k: v // 1000 for k, v in self.phases.items()}, "counters": self.counters}
+        if self.frame_budget is not None:
+            record["over_budget"] = total > self.frame_budget * 1e9
+        record.update(fields)
+        self.emit(record)
+        self.phases = {}
+        self.counters = {}
+        if self.profiler is not None and self.frame == self.profile_frames[1]:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.profile_out)
+            self.profiler = None
+            self.emit({"type": "profile", "frames": list(self.profile_frames), "path": self.profile_out})
+        self.frame += 1
+
+    def emit(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def write_loop(self):
+        try:
+            write, flush, close = open_sink(self.sink)
+        except OSError as exc:
+            print(f"telemetry: cannot open {self.sink}: {exc}", file=sys.stderr)
+            return
+        try:
+            while True:
+                record = self.queue.get()
+                if record is None:
+                    break
+                write(json.dumps(record) + "\n")
+                if self.queue.empty():
+                    flush()
+            write(json.dumps({"type": "summary", "frames": self.frame, "dropped": self.dropped}) + "\n")
+            flush()
+        except OSError:
+            pass
+        finally:
+            close()
+
+    def close(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.profile_out)
+            self.profiler = None
+        if self.writer.is_alive():
+            self.queue.put(None)
+            self.writer.join()